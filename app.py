@@ -1,13 +1,19 @@
 import uuid
 import streamlit as st
-from helpers.config import AppConfig
+from helpers import startup
+startup.install_from_env()
+from helpers.resources import get_app_config, get_profile_config
 from helpers.auth import get_logout, get_user_info
 from helpers.loog import logger
+from helpers.config import MetricsConfig
+from helpers.metrics import PAGE_RUN_SECONDS, start_metrics_exporter, timer
+from helpers.profiling import start_run_profiler
+from helpers.warmup import start_warmup
 
 # ------------- Application Class -------------
 class App:
     def __init__(self):
-        self.config = AppConfig()
+        self.config = get_app_config()
 
     def _set_page_config(self):
         st.set_page_config(
@@ -29,7 +35,23 @@ class App:
         get_logout()
         st.rerun()
 
+    def _start_profiler(self):
+        # ?profile=1 is remembered for the session so it survives page navigation.
+        if "profile" in st.query_params:
+            st.session_state["profile"] = st.query_params["profile"]
+        return start_run_profiler(get_profile_config(), st.session_state.get("profile"), st.session_state.get("roles"))
+
     def run(self):
+        profiler = self._start_profiler()
+        page = "app"
+        try:
+            page = self._run_page()
+        finally:
+            if profiler is not None:
+                profiler.stop(page)
+        startup.report_first_render()
+
+    def _run_page(self) -> str:
         self._set_page_config()
         self._set_header()
         self._init_session_state()
@@ -41,7 +63,7 @@ class App:
         )
 
         # Define pages
-        home_page = st.Page("pages/home.py", title="Home", icon="🚀", url_path="/")
+        home_page = st.Page("pages/home.py", title="Home", icon="🚀", default=True)
         agent_page = st.Page("pages/agent.py", title="Cell Agent", icon="💬", url_path="/cell-agent")
         user_page = st.Page("pages/user.py", title="User", icon="👤", url_path="/user")
 
@@ -67,11 +89,22 @@ class App:
                 "Account": [login_page]
             })
 
-        pg.run()
+        page = pg.url_path or "home"
+        with timer(PAGE_RUN_SECONDS, page=page):
+            pg.run()
+        return page
 
 # ------------- Main Execution -------------
 def main():
     try:
+        metrics_conf = MetricsConfig()
+        start_metrics_exporter(
+            port=metrics_conf.metrics_port,
+            host=metrics_conf.metrics_host,
+            path=metrics_conf.metrics_file or None,
+            interval_seconds=metrics_conf.metrics_file_interval_seconds,
+        )
+        start_warmup()
         app = App()
         app.run()
     except Exception as e:
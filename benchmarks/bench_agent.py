@@ -0,0 +1,221 @@
+"""
+Benchmark the agent page against the local stub backend.
+
+Drives pages/agent.py headlessly with Streamlit's AppTest through a scripted
+conversation, then processes a batch of synthetic attachments and sends them
+to the stub, and writes a JSON report (TTFT, render overhead, memory, CPU)
+for comparison across commits.
+
+AppTest reruns the whole page for every turn (it has no fragment-scoped
+reruns) and cannot attach files to st.chat_input. The conversation therefore
+measures full-page reruns; benchmarks.load_test covers fragment reruns. The
+attachments go through the same Utils.process_multiple_files and
+MakeRequest.stream_chat_completions calls the page makes on send.
+
+    python -m benchmarks.bench_agent --turns 10 --token-rate 200
+    python -m benchmarks.bench_agent --compare benchmarks/results/<old>.json
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import resource
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.stub_server import StubOptions, start_stub_server, stub_environment, stub_stats
+
+ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+PROMPTS = [
+    "Give me an overview of HTTP keep-alive.",
+    "Show a Python example of a retry loop with backoff.",
+    "Summarize the previous answer in three bullet points.",
+    "What are the trade-offs of server-sent events versus websockets?",
+    "Write a short markdown table comparing two caching strategies.",
+]
+
+class BenchUpload(io.BytesIO):
+    """Minimal stand-in for Streamlit's UploadedFile."""
+
+    def __init__(self, name: str, type: str, data: bytes):
+        super().__init__(data)
+        self.name = name
+        self.type = type
+        self.size = len(data)
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(values: list) -> dict:
+    return {
+        "mean": statistics.fmean(values) if values else 0.0,
+        "p50": percentile(values, 50),
+        "p99": percentile(values, 99),
+        "max": max(values) if values else 0.0,
+    }
+
+def bench_conversation(turns: int) -> dict:
+    from streamlit.testing.v1 import AppTest
+    from helpers.metrics import CHAT_STAGE_SECONDS
+
+    at = AppTest.from_file(str(ROOT / "pages" / "agent.py"), default_timeout=120)
+    at.session_state["chat_session_id"] = "bench-session"
+    at.run()
+
+    ttft, totals, run_times, overheads = [], [], [], []
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    for turn in range(turns):
+        ttft_before = CHAT_STAGE_SECONDS.totals(stage="ttft")
+        total_before = CHAT_STAGE_SECONDS.totals(stage="total")
+
+        messages_before = len(at.session_state["chat_history"])
+        started = time.perf_counter()
+        at.chat_input[0].set_value(PROMPTS[turn % len(PROMPTS)]).run()
+        run_time = time.perf_counter() - started
+        if at.exception or at.error:
+            raise RuntimeError(f"Agent page raised: {at.exception or at.error}")
+        if len(at.session_state["chat_history"]) != messages_before + 2:
+            raise RuntimeError(f"Turn {turn} did not add a user and an assistant message")
+
+        ttft_after = CHAT_STAGE_SECONDS.totals(stage="ttft")
+        total_after = CHAT_STAGE_SECONDS.totals(stage="total")
+        stream_time = total_after[0] - total_before[0]
+        if ttft_after[1] > ttft_before[1]:
+            ttft.append(ttft_after[0] - ttft_before[0])
+        totals.append(stream_time)
+        run_times.append(run_time)
+        overheads.append(max(run_time - stream_time, 0.0))
+
+    cpu_seconds = time.process_time() - cpu_start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "turns": turns,
+        "ttft_seconds": summarize(ttft),
+        "stream_seconds": summarize(totals),
+        "rerun_seconds": summarize(run_times),
+        "render_overhead_seconds": summarize(overheads),
+        "session_memory_bytes": current,
+        "peak_memory_bytes": peak,
+        "cpu_seconds": cpu_seconds,
+    }
+
+def bench_attachments(files: int, size_mb: float) -> dict:
+    from helpers.resources import get_make_request, get_utils
+    from langchain_community.chat_message_histories import StreamlitChatMessageHistory
+
+    utils = get_utils()
+    payload = os.urandom(int(size_mb * 1024 * 1024))
+    uploads = [BenchUpload(f"doc-{i}.pdf", "application/pdf", payload[i:] + payload[:i]) for i in range(files)]
+
+    tracemalloc.start()
+    cpu_start = time.process_time()
+    started = time.perf_counter()
+    attachments = utils.process_multiple_files(uploads)
+    elapsed = time.perf_counter() - started
+    send_started = time.perf_counter()
+    reply = "".join(get_make_request().stream_chat_completions("claude", StreamlitChatMessageHistory(key="bench_attachments"), PROMPTS[0], attachments))
+    send_seconds = time.perf_counter() - send_started
+    cpu_seconds = time.process_time() - cpu_start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if not reply or "[Error]" in reply:
+        raise RuntimeError(f"Sending attachments failed: {reply!r}")
+
+    return {
+        "files": files,
+        "file_size_mb": size_mb,
+        "completed": sum(1 for a in attachments if a.status.value == "completed"),
+        "elapsed_seconds": elapsed,
+        "send_seconds": send_seconds,
+        "cpu_seconds": cpu_seconds,
+        "retained_bytes": current,
+        "peak_memory_bytes": peak,
+    }
+
+def compare(current: dict, baseline_path: Path):
+    baseline = json.loads(baseline_path.read_text())
+    rows = [
+        ("ttft p50", ("conversation", "ttft_seconds", "p50")),
+        ("ttft p99", ("conversation", "ttft_seconds", "p99")),
+        ("render overhead p50", ("conversation", "render_overhead_seconds", "p50")),
+        ("session memory", ("conversation", "session_memory_bytes")),
+        ("conversation cpu", ("conversation", "cpu_seconds")),
+        ("attachments elapsed", ("attachments", "elapsed_seconds")),
+        ("attachments send", ("attachments", "send_seconds")),
+        ("attachments peak memory", ("attachments", "peak_memory_bytes")),
+    ]
+    print(f"\nComparison with {baseline_path.name} ({baseline.get('revision')}):")
+    for label, path in rows:
+        old, new = baseline, current
+        for key in path:
+            old, new = old.get(key, {}), new.get(key, {})
+        if isinstance(old, (int, float)) and isinstance(new, (int, float)) and old:
+            print(f"  {label:<26} {old:>14.4f} -> {new:>14.4f}  ({(new - old) / old * 100:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Cell agent page against a local stub backend.")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--token-rate", type=float, default=200.0)
+    parser.add_argument("--tokens-per-chunk", type=int, default=4)
+    parser.add_argument("--reply-tokens", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--attachments", type=int, default=4)
+    parser.add_argument("--attachment-mb", type=float, default=5.0)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="previous result JSON to diff against")
+    args = parser.parse_args()
+
+    options = StubOptions(args.token_rate, args.tokens_per_chunk, args.reply_tokens, args.latency)
+    server = start_stub_server(options)
+
+    # Configuration is read at import time, so the environment must be set first.
+    os.environ.update(stub_environment(server))
+    os.environ.setdefault("LOG_FILE", "false")
+    os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="cell-bench-"))
+    os.environ.setdefault("FEEDBACK_SPILL_PATH", os.path.join(os.environ["LOG_DIR"], "feedback-spill.jsonl"))
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "stub": vars(options),
+        "conversation": bench_conversation(args.turns),
+        "attachments": bench_attachments(args.attachments, args.attachment_mb),
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "backend": stub_stats(server),
+    }
+    server.shutdown()
+
+    output = args.output or RESULTS_DIR / f"{report['timestamp'].replace(':', '')}-{report['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == "__main__":
+    main()
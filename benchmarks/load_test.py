@@ -0,0 +1,324 @@
+"""
+Multi-session load generator for capacity planning.
+
+Starts the stub backend and a headless `streamlit run app.py`, then simulates
+N concurrent users over Streamlit's websocket protocol: each logs in, opens
+the agent page with its own chat_session_id and sends scripted prompts.
+Users are ramped up gradually. Reports p50/p99 TTFT, websocket message
+volume, and server RSS/CPU sampled from /proc.
+
+A send normally reruns only the chat fragment. Once the live turns exceed
+HISTORY_PAGE_SIZE messages the page does one full rerun to fold them into the
+history window; those turns are reported separately. --history-page-size is
+small by default so a short run crosses it.
+
+Log in as a test account from auth_config.yml, given on the command line or
+through LOAD_TEST_USERNAME / LOAD_TEST_PASSWORD:
+
+    LOAD_TEST_USERNAME=... LOAD_TEST_PASSWORD=... python -m benchmarks.load_test --users 50 --ramp 60 --turns 5
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from pathlib import Path
+from dataclasses import dataclass, field
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+from benchmarks.stub_server import StubOptions, start_stub_server, stub_environment, stub_stats
+from benchmarks.bench_agent import PROMPTS, RESULTS_DIR, ROOT, git_revision, percentile
+
+CURSOR = "▌"
+EARLY_FOR_RERUN = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+
+@dataclass
+class UserStats:
+    ttft: list = field(default_factory=list)
+    turn_seconds: list = field(default_factory=list)
+    turn_bytes: list = field(default_factory=list)
+    app_rerun_turn_seconds: list = field(default_factory=list)
+    app_rerun_turn_bytes: list = field(default_factory=list)
+    messages_received: int = 0
+    bytes_received: int = 0
+    messages_sent: int = 0
+    errors: list = field(default_factory=list)
+
+class StreamlitUser:
+    """One simulated browser session speaking the Streamlit websocket protocol."""
+
+    def __init__(self, url: str, stats: UserStats, timeout: float):
+        self.url = url
+        self.stats = stats
+        self.timeout = timeout
+        self.widgets = {}
+        self.fragments = {}  # widget id -> id of the fragment that rendered it
+        self.connection = None
+        self.app_rerun = False  # the last run was restarted as a full app rerun
+        self.page_script_hash = ""  # page shown by the last full run
+
+    async def connect(self):
+        self.connection = await websockets.connect(self.url, subprotocols=["streamlit"], max_size=None)
+
+    async def close(self):
+        if self.connection is not None:
+            await self.connection.close()
+
+    async def rerun(self, widget_states: list = (), page_name: str = "", fragment_id: str = "") -> float:
+        """
+        Send a rerun, scoped to a fragment when `fragment_id` is set as the
+        browser does, and wait for it to finish. Returns seconds to the first
+        streamed token, or -1.
+        """
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_name = page_name
+        msg.rerun_script.fragment_id = fragment_id
+        if fragment_id:
+            # As the browser does: a full rerun started from the fragment stays on this page.
+            msg.rerun_script.page_script_hash = self.page_script_hash
+        msg.rerun_script.widget_states.widgets.extend(widget_states)
+        await self.connection.send(msg.SerializeToString())
+        self.stats.messages_sent += 1
+        return await self._wait_for_run(time.perf_counter())
+
+    async def _wait_for_run(self, sent: float) -> float:
+        first_token = -1.0
+        self.app_rerun = False
+        while True:
+            raw = await asyncio.wait_for(self.connection.recv(), timeout=self.timeout)
+            self.stats.messages_received += 1
+            self.stats.bytes_received += len(raw)
+
+            msg = ForwardMsg.FromString(raw)
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                element_type = element.WhichOneof("type")
+                widget = getattr(element, element_type)
+                if hasattr(widget, "id") and widget.id:
+                    self.widgets[(element_type, getattr(widget, "label", "") or getattr(widget, "placeholder", ""))] = widget.id
+                    self.fragments[widget.id] = msg.delta.fragment_id
+                if element_type == "markdown" and first_token < 0 and widget.body.endswith(CURSOR):
+                    first_token = time.perf_counter() - sent
+            elif kind == "navigation":
+                self.page_script_hash = msg.navigation.page_script_hash
+            elif kind == "script_finished":
+                if msg.script_finished != EARLY_FOR_RERUN:
+                    return first_token
+                self.app_rerun = True
+
+    def widget_id(self, element_type: str, label: str = None) -> str:
+        for (kind, widget_label), widget_id in self.widgets.items():
+            if kind == element_type and (label is None or widget_label == label):
+                return widget_id
+        raise LookupError(f"{element_type} {label or ''} not rendered")
+
+    async def login(self, username: str, password: str):
+        await self.rerun()
+        states = []
+        for label, value in (("Username", username), ("Password", password)):
+            state = WidgetState(id=self.widget_id("text_input", label))
+            state.string_value = value
+            states.append(state)
+        submit = WidgetState(id=self.widget_id("button", "Login"))
+        submit.trigger_value = True
+        states.append(submit)
+        await self.rerun(states)
+
+    async def send_prompt(self, prompt: str) -> float:
+        state = WidgetState(id=self.widget_id("chat_input"))
+        if "chat_input_value" in WidgetState.DESCRIPTOR.fields_by_name:
+            state.chat_input_value.data = prompt
+        else:
+            state.string_trigger_value.data = prompt
+        # The chat input lives in a fragment, so a send only reruns that fragment.
+        return await self.rerun([state], page_name="cell-agent", fragment_id=self.fragments.get(state.id, ""))
+
+async def run_user(index: int, args, url: str, stats: UserStats, start_delay: float):
+    await asyncio.sleep(start_delay)
+    user = StreamlitUser(url, stats, args.timeout)
+    try:
+        await user.connect()
+        await user.login(args.username, args.password)
+        await user.rerun(page_name="cell-agent")
+        for turn in range(args.turns):
+            started, received = time.perf_counter(), stats.bytes_received
+            ttft = await user.send_prompt(PROMPTS[(index + turn) % len(PROMPTS)])
+            if user.app_rerun:
+                stats.app_rerun_turn_seconds.append(time.perf_counter() - started)
+                stats.app_rerun_turn_bytes.append(stats.bytes_received - received)
+            else:
+                stats.turn_seconds.append(time.perf_counter() - started)
+                stats.turn_bytes.append(stats.bytes_received - received)
+            if ttft >= 0:
+                stats.ttft.append(ttft)
+            await asyncio.sleep(args.think_time)
+    except Exception as e:
+        stats.errors.append(f"user {index}: {type(e).__name__}: {e}")
+    finally:
+        await user.close()
+
+class ProcessSampler:
+    """Sample RSS and CPU time of a process from /proc."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.rss_kb = []
+        self.cpu_percent = []
+        self._last = None
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as file:
+            fields = file.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    def _rss_kb(self) -> int:
+        with open(f"/proc/{self.pid}/status") as file:
+            for line in file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+        return 0
+
+    async def run(self, interval: float):
+        while True:
+            now, cpu = time.monotonic(), self._cpu_seconds()
+            if self._last is not None:
+                self.cpu_percent.append((cpu - self._last[1]) / (now - self._last[0]) * 100)
+            self._last = (now, cpu)
+            self.rss_kb.append(self._rss_kb())
+            await asyncio.sleep(interval)
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def wait_for_server(port: int, timeout: float = 60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=2)
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise TimeoutError("streamlit server did not become healthy")
+
+async def run_load(args, url: str, pid: int) -> dict:
+    sampler = ProcessSampler(pid)
+    sampling = asyncio.ensure_future(sampler.run(args.sample_interval))
+
+    users = [UserStats() for _ in range(args.users)]
+    step = args.ramp / args.users if args.users else 0
+    started = time.perf_counter()
+    await asyncio.gather(*(run_user(i, args, url, users[i], i * step) for i in range(args.users)))
+    elapsed = time.perf_counter() - started
+    sampling.cancel()
+
+    def collect(name: str) -> list:
+        return [value for user in users for value in getattr(user, name)]
+
+    ttft = collect("ttft")
+    turns, turn_bytes = collect("turn_seconds"), collect("turn_bytes")
+    app_reruns, app_rerun_bytes = collect("app_rerun_turn_seconds"), collect("app_rerun_turn_bytes")
+    return {
+        "elapsed_seconds": elapsed,
+        "completed_turns": len(turns) + len(app_reruns),
+        "failed_users": sum(1 for user in users if user.errors),
+        "ttft_seconds": {"p50": percentile(ttft, 50), "p99": percentile(ttft, 99)},
+        "turn_seconds": {"p50": percentile(turns, 50), "p99": percentile(turns, 99)},
+        "app_rerun_turns": len(app_reruns),
+        "app_rerun_turn_seconds": {"p50": percentile(app_reruns, 50), "p99": percentile(app_reruns, 99)},
+        "websocket": {
+            "messages_received": sum(user.messages_received for user in users),
+            "bytes_received": sum(user.bytes_received for user in users),
+            "messages_sent": sum(user.messages_sent for user in users),
+            "bytes_per_turn": sum(turn_bytes) / max(len(turn_bytes), 1),
+            "bytes_per_app_rerun_turn": sum(app_rerun_bytes) / max(len(app_rerun_bytes), 1),
+        },
+        "server": {
+            "rss_kb_peak": max(sampler.rss_kb, default=0),
+            "rss_kb_final": sampler.rss_kb[-1] if sampler.rss_kb else 0,
+            "cpu_percent_mean": sum(sampler.cpu_percent) / max(len(sampler.cpu_percent), 1),
+            "cpu_percent_peak": max(sampler.cpu_percent, default=0),
+        },
+        "errors": [error for user in users for error in user.errors][:50],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent users against a local Cell replica.")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--ramp", type=float, default=30.0, help="seconds over which users are started")
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--think-time", type=float, default=2.0)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--username", default=os.getenv("LOAD_TEST_USERNAME"), help="defaults to $LOAD_TEST_USERNAME")
+    parser.add_argument("--password", default=os.getenv("LOAD_TEST_PASSWORD"), help="defaults to $LOAD_TEST_PASSWORD")
+    parser.add_argument("--token-rate", type=float, default=50.0)
+    parser.add_argument("--tokens-per-chunk", type=int, default=4)
+    parser.add_argument("--reply-tokens", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--sample-interval", type=float, default=1.0)
+    parser.add_argument("--history-page-size", type=int, default=4, help="HISTORY_PAGE_SIZE for the server")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+    if not args.username or not args.password:
+        parser.error("set --username/--password or LOAD_TEST_USERNAME/LOAD_TEST_PASSWORD")
+
+    options = StubOptions(args.token_rate, args.tokens_per_chunk, args.reply_tokens, args.latency)
+    stub = start_stub_server(options)
+
+    log_dir = tempfile.mkdtemp(prefix="cell-load-")
+    port = free_port()
+    env = {
+        **os.environ,
+        **stub_environment(stub),
+        "LOG_DIR": log_dir,
+        "HISTORY_PAGE_SIZE": str(args.history_page_size),
+        "FEEDBACK_SPILL_PATH": os.path.join(log_dir, "feedback-spill.jsonl"),
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "app.py",
+         "--server.headless", "true", "--server.port", str(port),
+         "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT,
+    )
+    try:
+        wait_for_server(port)
+        result = asyncio.run(run_load(args, f"ws://127.0.0.1:{port}/_stcore/stream", server.pid))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        stub.shutdown()
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "users": args.users,
+        "ramp_seconds": args.ramp,
+        "turns_per_user": args.turns,
+        "stub": vars(options),
+        **result,
+        "backend": stub_stats(stub),
+    }
+    output = args.output or RESULTS_DIR / f"load-{report['timestamp'].replace(':', '')}-{report['revision']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(json.dumps(report, indent=2))
+    print(f"\nSaved {output}")
+
+    if report["completed_turns"] == 0 or report["failed_users"] == args.users:
+        print(f"Load test failed: {report['failed_users']}/{args.users} users errored, {report['completed_turns']} turns completed", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Local stand-ins for the chat service and AWS Secrets Manager.
+
+Serves, under /v1/:
+  POST chat/agent/completions   streamed tokens (configurable rate, chunk size, latency)
+  POST chat/feedback[/batch]    accepts feedback
+  HEAD/POST chat/files[/<sha>]  upload-once attachment store
+  GET  health                   readiness probe
+and the Secrets Manager GetSecretValue JSON API on "/" (X-Amz-Target header),
+so boto3 can be pointed at it with AWS_ENDPOINT_URL_SECRETS_MANAGER.
+
+Run standalone: python -m benchmarks.stub_server --port 8900 --token-rate 50
+"""
+import json
+import time
+import argparse
+import threading
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPLY = (
+    "Here is a short answer with some structure.\n\n"
+    "The first paragraph explains the idea in a few sentences so the renderer has "
+    "complete blocks to freeze while the rest of the reply is still streaming.\n\n"
+    "```python\ndef handler(event):\n    return {\"status\": 200, \"body\": event}\n```\n\n"
+    "- first point\n- second point\n- third point\n\n"
+    "And a closing paragraph that keeps going until the token budget is used up. "
+)
+
+@dataclass
+class StubOptions:
+    token_rate: float = 50.0         # tokens per second, 0 = as fast as possible
+    tokens_per_chunk: int = 4        # tokens written per HTTP chunk
+    reply_tokens: int = 300          # tokens per completion
+    latency_seconds: float = 0.2     # delay before the first byte
+    secrets: dict = field(default_factory=lambda: {
+        "cell_auth_key": "bench-auth-key",
+        "cell_jwt_secret_key": "bench-jwt-secret",
+    })
+
+@dataclass
+class StubStats:
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    requests: dict = field(default_factory=dict)
+    request_bytes: int = 0
+    response_bytes: int = 0
+
+    def record(self, route: str, received: int, sent: int):
+        with self.lock:
+            self.requests[route] = self.requests.get(route, 0) + 1
+            self.request_bytes += received
+            self.response_bytes += sent
+
+    def as_dict(self) -> dict:
+        with self.lock:
+            return {"requests": dict(self.requests), "request_bytes": self.request_bytes, "response_bytes": self.response_bytes}
+
+def _tokens(count: int):
+    words = REPLY.split(" ")
+    for i in range(count):
+        yield words[i % len(words)] + " "
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    options: StubOptions = StubOptions()
+    stats: StubStats = StubStats()
+    files: set = set()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            return b"".join(parts)
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def _send_json(self, route: str, received: int, status: int, body: dict, content_type: str = "application/json"):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.stats.record(route, received, len(data))
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/health"):
+            self._send_json("health", 0, 200, {"status": "ok"})
+        else:
+            self._send_json("unknown", 0, 404, {"detail": "not found"})
+
+    def do_HEAD(self):
+        sha256 = self.path.rstrip("/").rsplit("/", 1)[-1]
+        self.send_response(200 if sha256 in self.files else 404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        self.stats.record("files_head", 0, 0)
+
+    def do_POST(self):
+        body = self._read_body()
+        target = self.headers.get("X-Amz-Target", "")
+        if target == "secretsmanager.GetSecretValue":
+            request = json.loads(body or b"{}")
+            self._send_json("secrets", len(body), 200, {
+                "ARN": f"arn:aws:secretsmanager:us-east-1:000000000000:secret:{request.get('SecretId')}",
+                "Name": request.get("SecretId"),
+                "SecretString": json.dumps(self.options.secrets),
+                "VersionId": "bench",
+            }, content_type="application/x-amz-json-1.1")
+        elif self.path.endswith("/chat/agent/completions"):
+            self._stream_completion(len(body))
+        elif "/chat/feedback" in self.path:
+            self._send_json("feedback", len(body), 200, {"status": "ok"})
+        elif self.path.endswith("/chat/files"):
+            request = json.loads(body) if body.startswith(b"{") else {}
+            if request.get("sha256"):
+                self.files.add(request["sha256"])
+            self._send_json("files", len(body), 200, {"status": "ok"})
+        else:
+            self._send_json("unknown", len(body), 404, {"detail": "not found"})
+
+    def _stream_completion(self, received: int):
+        options = self.options
+        time.sleep(options.latency_seconds)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        sent = 0
+        interval = options.tokens_per_chunk / options.token_rate if options.token_rate > 0 else 0
+        chunk = []
+        for token in _tokens(options.reply_tokens):
+            chunk.append(token)
+            if len(chunk) >= options.tokens_per_chunk:
+                sent += self._write_chunk("".join(chunk).encode("utf-8"))
+                chunk.clear()
+                if interval:
+                    time.sleep(interval)
+        if chunk:
+            sent += self._write_chunk("".join(chunk).encode("utf-8"))
+        self.wfile.write(b"0\r\n\r\n")
+        self.stats.record("completions", received, sent)
+
+    def _write_chunk(self, data: bytes) -> int:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+        return len(data)
+
+def start_stub_server(options: StubOptions, port: int = 0, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Start the stub on a background thread; `server.server_address` has the bound port."""
+    handler = type("BoundStubHandler", (StubHandler,), {"options": options, "stats": StubStats(), "files": set()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="stub-server", daemon=True).start()
+    return server
+
+def stub_stats(server: ThreadingHTTPServer) -> dict:
+    return server.RequestHandlerClass.stats.as_dict()
+
+def stub_environment(server: ThreadingHTTPServer) -> dict:
+    """Environment variables that point the app at the stub."""
+    host, port = server.server_address[:2]
+    base = f"http://{host}:{port}"
+    return {
+        "CHAT_SERVICE_API": f"{base}/v1/",
+        "CHAT_SERVICE_AUTH_KEY_NAME": "cell_auth_key",
+        "JWT_KEY_NAME": "cell_jwt_secret_key",
+        "AWS_ENDPOINT_URL_SECRETS_MANAGER": base,
+        "AWS_SECRET_NAME": "bench",
+        "AWS_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "bench",
+        "AWS_SECRET_ACCESS_KEY": "bench",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub chat service and Secrets Manager.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--token-rate", type=float, default=50.0)
+    parser.add_argument("--tokens-per-chunk", type=int, default=4)
+    parser.add_argument("--reply-tokens", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    server = start_stub_server(
+        StubOptions(args.token_rate, args.tokens_per_chunk, args.reply_tokens, args.latency),
+        port=args.port,
+        host=args.host,
+    )
+    for key, value in stub_environment(server).items():
+        print(f"{key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+from typing import Dict, Optional
+from helpers.loog import logger
+from helpers.utils import Utils, FileMetadata, FileProcessStatus
+
+class ModelAdapter:
+    """
+    Build the outgoing message list for one chat model.
+    Messages are assembled in a single pass, and all attachments of a turn are
+    grouped into one multi-part user message after the prompt text.
+    """
+
+    name: str = ""
+    supports_images: bool = False
+    supports_documents: bool = False
+
+    def build_messages(self, history_messages: list, prompt: str, attachments: list) -> list:
+        messages = [self.history_message(m) for m in history_messages]
+        messages.append(self.user_message(prompt, attachments))
+        return messages
+
+    def history_message(self, message) -> dict:
+        return {"role": "user" if message.type == "human" else "assistant", "content": message.content}
+
+    def user_message(self, prompt: str, attachments: list) -> dict:
+        parts = [{"type": "text", "text": prompt}]
+        for attachment in attachments or []:
+            if attachment.status != FileProcessStatus.COMPLETED:
+                continue
+            part = self.attachment_part(attachment)
+            if part is not None:
+                parts.append(part)
+            else:
+                logger.warning(f"[FE-CHAT_SERVICE] Attachment {attachment.name} not supported by {self.name}, skipped")
+
+        if len(parts) == 1:
+            return {"role": "user", "content": prompt}
+        return {"role": "user", "content": parts}
+
+    def supports(self, attachment: FileMetadata) -> bool:
+        return self.attachment_part(attachment) is not None
+
+    def attachment_part(self, attachment: FileMetadata) -> Optional[dict]:
+        if attachment.is_text and attachment.content:
+            return {"type": "text", "text": attachment.content}
+        if attachment.is_document and attachment.content:
+            return self.extracted_document_part(attachment)
+        if self.supports_images and attachment.is_image and attachment.base64:
+            return self.image_part(attachment)
+        if self.supports_documents and attachment.is_document and attachment.base64:
+            return self.document_part(attachment)
+        return None
+
+    def image_part(self, attachment: FileMetadata) -> dict:
+        if attachment.reference:
+            return {
+                "type": "image",
+                "source": {
+                    "type": "reference",
+                    "media_type": attachment.type,
+                    "sha256": attachment.content_sha256,
+                },
+            }
+        return {
+            "type": "image",
+            "source": {
+                "type": "base64",
+                "media_type": attachment.type,
+                "data": attachment.base64,
+            },
+        }
+
+    def document_part(self, attachment: FileMetadata) -> dict:
+        if attachment.reference:
+            source = {"sha256": attachment.content_sha256}
+        else:
+            source = {"bytes": attachment.base64} #(convert bytes → base64 string) for sending over HTTP
+        return {
+            "document": {
+                # Available formats: html, md, pdf, doc/docx, xls/xlsx, csv, and txt
+                "format": Utils.get_file_format(attachment.type),
+                "name": Utils.format_filename(attachment.name),
+                "source": source,
+            }
+        }
+
+    def extracted_document_part(self, attachment: FileMetadata) -> dict:
+        """Document sent as its locally extracted text."""
+        return {
+            "type": "text",
+            "text": f"<document name=\"{Utils.format_filename(attachment.name)}\">\n{attachment.content}\n</document>",
+        }
+
+class ClaudeAdapter(ModelAdapter):
+    name = "claude"
+    supports_images = True
+    supports_documents = True
+
+class LlamaAdapter(ModelAdapter):
+    name = "llama"
+
+class GptOssAdapter(ModelAdapter):
+    name = "gpt-oss"
+
+_adapters: Dict[str, ModelAdapter] = {}
+
+def register_adapter(adapter: ModelAdapter):
+    """Register (or replace) the adapter used for `adapter.name`."""
+    _adapters[adapter.name] = adapter
+
+def get_adapter(chat_model: str) -> Optional[ModelAdapter]:
+    return _adapters.get(chat_model)
+
+for _adapter in (ClaudeAdapter(), LlamaAdapter(), GptOssAdapter()):
+    register_adapter(_adapter)
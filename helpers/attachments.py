@@ -0,0 +1,99 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    from helpers.utils import FileMetadata
+
+def hash_file(file, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 of an uploaded file and rewind it."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    while chunk := file.read(chunk_size):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+class AttachmentStore:
+    """
+    Content-addressed LRU of processed attachments, capped by total size.
+    Entries are keyed by content hash and uploaded MIME type, so the same
+    bytes uploaded as a different type are processed again.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, FileMetadata]" = OrderedDict()
+        self._size = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def entry_size(attachment: "FileMetadata") -> int:
+        return len(attachment.base64 or "") + len(attachment.content or "") + len(attachment.thumbnail or b"")
+
+    def get(self, sha256: str, source_type: str) -> Optional["FileMetadata"]:
+        """Return a private copy of the cached attachment, if any."""
+        key = (sha256, source_type)
+        with self._lock:
+            attachment = self._entries.get(key)
+            if attachment is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return replace(attachment)
+
+    def put(self, attachment: "FileMetadata", source_type: str):
+        """Cache a processed attachment under its hash and the MIME type it was uploaded as."""
+        size = self.entry_size(attachment)
+        if not attachment.sha256 or size > self.max_bytes:
+            return
+        key = (attachment.sha256, source_type)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= self.entry_size(previous)
+            self._entries[key] = replace(attachment)
+            self._size += size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= self.entry_size(evicted)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), bytes=self._size)
+
+class UploadTracker:
+    """Remember which attachment hashes the backend already holds."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._uploaded: "OrderedDict[str, float]" = OrderedDict()
+
+    def is_uploaded(self, sha256: str) -> bool:
+        with self._lock:
+            expires_at = self._uploaded.get(sha256)
+            if expires_at is None:
+                return False
+            if expires_at < time.monotonic():
+                del self._uploaded[sha256]
+                return False
+            return True
+
+    def mark_uploaded(self, sha256: str):
+        with self._lock:
+            self._uploaded[sha256] = time.monotonic() + self.ttl_seconds
+            self._uploaded.move_to_end(sha256)
+            while len(self._uploaded) > self.max_entries:
+                self._uploaded.popitem(last=False)
+
+    def forget(self):
+        with self._lock:
+            self._uploaded.clear()
@@ -1,20 +1,45 @@
 import streamlit as st
-import jwt
 from typing import Optional, Dict
 import extra_streamlit_components as stx
-from helpers.config import AppConfig, AWSConfig
-from helpers.secret import AWSSecretManager
+from helpers.resources import get_app_config, get_claims_cache, get_secret_manager
+from helpers.metrics import AUTH_JWT_VERIFY_SECONDS, timer
 
-app_conf = AppConfig()
-aws_conf = AWSConfig()
-aws_secret_manager = AWSSecretManager(app_conf, aws_conf)
-cookie_manager = stx.CookieManager()
+app_conf = get_app_config()
 
-jwt_secret_key = aws_secret_manager.get_secret(app_conf.jwt_key_name)
+def get_cookie_manager() -> stx.CookieManager:
+    # One manager per browser session; a module-level one would share the
+    # first session's cookie snapshot with every other session.
+    if "cookie_manager" not in st.session_state:
+        st.session_state["cookie_manager"] = stx.CookieManager(key="cookie-manager")
+    return st.session_state["cookie_manager"]
+
+def get_cookies(extend_key: str) -> Dict:
+    """
+    Read the browser cookies once per session.
+    The component round trip only happens until it returns a value; later
+    reruns reuse the memoized cookies until they are changed or cleared.
+    """
+    cookies = st.session_state.get("auth_cookies")
+    if cookies is None:
+        cookies = get_cookie_manager().get_all(key="cookie-"+extend_key) or {}
+        if cookies:
+            st.session_state["auth_cookies"] = cookies
+    return cookies
+
+def get_jwt_secret_key() -> str:
+    # Fetched on first verification rather than at import; the secret cache keeps it warm.
+    return get_secret_manager().get_secret(app_conf.jwt_key_name)
 
 def verify_jwt_cookie(jwt_cookie: str) -> Optional[Dict]:
+    claims_cache = get_claims_cache()
+    payload = claims_cache.get(jwt_cookie)
+    if payload is not None:
+        return payload
+    import jwt
     try:
-        payload = jwt.decode(jwt_cookie, jwt_secret_key, algorithms=["HS256"])
+        with timer(AUTH_JWT_VERIFY_SECONDS):
+            payload = jwt.decode(jwt_cookie, get_jwt_secret_key(), algorithms=["HS256"])
+        claims_cache.put(jwt_cookie, payload)
         return payload
     except jwt.ExpiredSignatureError:
         st.warning("Session expired. Please log in again.")
@@ -24,27 +49,28 @@ def verify_jwt_cookie(jwt_cookie: str) -> Optional[Dict]:
         return None
     
 def clear_jwt_cookie(cookie_name: str):
-    cookie_manager.delete(cookie_name)
+    cookies = st.session_state.pop("auth_cookies", None) or {}
+    if cookies.get(cookie_name):
+        get_claims_cache().invalidate(cookies[cookie_name])
+    try:
+        get_cookie_manager().delete(cookie_name)
+    except KeyError:
+        # The manager's own snapshot never held the cookie; nothing to remove.
+        pass
 
 def get_logout():
     st.session_state["authentication_status"] = None
-    clear_jwt_cookie("cell")
+    clear_jwt_cookie(app_conf.auth_cookie_name)
 
 def get_user_info(extend_key: str) -> Optional[Dict]:
-    all_cookies = cookie_manager.get_all(key="cookie-"+extend_key)
-
-    if 'cell' in all_cookies:
-        jwt_cookie = all_cookies['cell']
-    
     if st.session_state.get("authentication_status"):
         user_info = st.session_state.get("username")
-        if not user_info:
-            user_info = verify_jwt_cookie(jwt_cookie)
-        return user_info
-    elif jwt_cookie:
-        user_info = verify_jwt_cookie(jwt_cookie)
         if user_info:
             return user_info
-    else:
-        clear_jwt_cookie("cell")
-        return None
\ No newline at end of file
+
+    jwt_cookie = get_cookies(extend_key).get(app_conf.auth_cookie_name)
+    if jwt_cookie:
+        return verify_jwt_cookie(jwt_cookie)
+    if not st.session_state.get("authentication_status"):
+        clear_jwt_cookie(app_conf.auth_cookie_name)
+    return None
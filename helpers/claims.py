@@ -0,0 +1,64 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+def token_digest(token: str) -> str:
+    """SHA-256 of a token, so raw JWTs are never held as cache keys."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+class ClaimsCache:
+    """
+    LRU of verified JWT claims keyed by token digest.
+    Entries are served until the token's `exp`, capped at `max_ttl_seconds`
+    so a rotated signing key is picked up within that window.
+    """
+
+    def __init__(self, max_entries: int, max_ttl_seconds: int):
+        self.max_entries = max_entries
+        self.max_ttl_seconds = max_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0}
+
+    def get(self, token: str) -> Optional[Dict]:
+        key = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            claims, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return dict(claims)
+
+    def put(self, token: str, claims: Dict):
+        if self.max_entries <= 0:
+            return
+        expires_at = time.time() + self.max_ttl_seconds
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, claims["exp"])
+        key = token_digest(token)
+        with self._lock:
+            self._entries[key] = (dict(claims), expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: Optional[str] = None):
+        """Drop one token, or every cached entry."""
+        with self._lock:
+            if token is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(token_digest(token), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
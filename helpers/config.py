@@ -1,9 +1,8 @@
 import os
-from typing import List
+from typing import Dict, List
 from pathlib import Path
 from dotenv import load_dotenv
 from dataclasses import dataclass, field
-from pydantic import BaseModel, Field
 
 load_dotenv()
 
@@ -24,13 +23,35 @@ class AppConfig(object):
     
     jwt_key_name: str = os.getenv("JWT_KEY_NAME", "cell_jwt_secret_key")
 
-class FileConfig(BaseModel):
-    allowed_file_types: list[str] = Field(
+    auth_config_path: Path = Path(os.getenv("AUTH_CONFIG_PATH", "auth_config.yml"))
+    auth_hashed_config_path: str = os.getenv("AUTH_HASHED_CONFIG_PATH", "")  # empty disables the on-disk hashed copy
+    auth_cookie_name: str = os.getenv("AUTH_COOKIE_NAME", "cell")
+    auth_claims_cache_size: int = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "1024"))  # 0 disables the claims cache
+    auth_claims_max_ttl_seconds: int = int(os.getenv("AUTH_CLAIMS_MAX_TTL_SECONDS", "300"))
+
+@dataclass
+class FileConfig(object):
+    """File upload configuration class."""
+
+    allowed_file_types: List[str] = field(
         default_factory=lambda: os.getenv(
             "ALLOWED_FILE_TYPES", "txt,html,md,pdf,docx,doc,png,jpg,jpeg,csv,xlsx,xls"
         ).split(",")
     )
     max_upload_size_mb: int = int(os.getenv("MAX_UPLOAD_SIZE_MB", "10"))
+    max_workers: int = int(os.getenv("FILE_PROCESS_WORKERS", "4"))  # files processed concurrently
+    read_chunk_size: int = int(os.getenv("FILE_READ_CHUNK_SIZE", "786432"))  # bytes per base64 chunk
+    thumbnail_size: int = int(os.getenv("FILE_THUMBNAIL_SIZE", "200"))  # max preview edge in px
+    image_preprocess: bool = os.getenv("IMAGE_PREPROCESS", "true").lower() == "true"  # requires Pillow
+    image_max_dimension: int = int(os.getenv("IMAGE_MAX_DIMENSION", "1568"))  # long edge in px
+    image_max_pixels: int = int(os.getenv("IMAGE_MAX_PIXELS", "1150000"))
+    image_quality: int = int(os.getenv("IMAGE_QUALITY", "85"))  # JPEG quality
+    image_cache_size: int = int(os.getenv("IMAGE_CACHE_SIZE", "128"))  # processed images kept in memory
+    attachment_cache_mb: int = int(os.getenv("ATTACHMENT_CACHE_MB", "256"))  # processed attachments kept in memory
+    extract_documents: bool = os.getenv("EXTRACT_DOCUMENTS", "false").lower() == "true"  # send PDF/DOCX/XLSX/CSV as text
+    extract_workers: int = int(os.getenv("EXTRACT_WORKERS", "2"))  # extraction processes
+    extract_max_chars: int = int(os.getenv("EXTRACT_MAX_CHARS", "200000"))
+    extract_timeout_seconds: float = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "60"))
 
 
 @dataclass
@@ -39,6 +60,8 @@ class AWSConfig(object):
 
     aws_region: str = os.getenv("AWS_REGION", "us-southeast-1")
     aws_secret_name: str = os.getenv("AWS_SECRET_NAME", "")
+    aws_secret_ttl_seconds: int = int(os.getenv("AWS_SECRET_TTL_SECONDS", "300"))  # 0 disables caching
+    aws_secret_retry_seconds: int = int(os.getenv("AWS_SECRET_RETRY_SECONDS", "30"))  # retry delay after a failed refresh
 
 @dataclass
 class ChatConfig(object):
@@ -47,14 +70,52 @@ class ChatConfig(object):
     chat_service_api: str = os.getenv("CHAT_SERVICE_API", "http://localhost:8000/v1/")
     chat_auth_key_name: str = os.getenv("CHAT_SERVICE_AUTH_KEY_NAME", "cell_auth_key")
     chat_timeout_seconds: int = int(os.getenv("CHAT_SERVICE_TIMEOUT_SECONDS", "300"))
+    chat_connect_timeout_seconds: float = float(os.getenv("CHAT_SERVICE_CONNECT_TIMEOUT_SECONDS", "10"))
+    chat_read_timeout_seconds: float = float(os.getenv("CHAT_SERVICE_READ_TIMEOUT_SECONDS", os.getenv("CHAT_SERVICE_TIMEOUT_SECONDS", "300")))
+    chat_stream_idle_timeout_seconds: float = float(os.getenv("CHAT_SERVICE_STREAM_IDLE_TIMEOUT_SECONDS", os.getenv("CHAT_SERVICE_TIMEOUT_SECONDS", "300")))  # max gap between streamed chunks
+    chat_pool_connections: int = int(os.getenv("CHAT_SERVICE_POOL_CONNECTIONS", "4"))  # number of host pools
+    chat_pool_maxsize: int = int(os.getenv("CHAT_SERVICE_POOL_MAXSIZE", "32"))  # connections kept per host
+    chat_keep_alive: bool = os.getenv("CHAT_SERVICE_KEEP_ALIVE", "true").lower() == "true"
+    chat_keep_alive_idle_seconds: int = int(os.getenv("CHAT_SERVICE_KEEP_ALIVE_IDLE_SECONDS", "60"))  # TCP keepalive probe delay
+    chat_attachment_references: bool = os.getenv("CHAT_ATTACHMENT_REFERENCES", "false").lower() == "true"  # upload once, then send by hash
+    chat_attachment_reference_ttl_seconds: int = int(os.getenv("CHAT_ATTACHMENT_REFERENCE_TTL_SECONDS", "3600"))
+    chat_transport: str = os.getenv("CHAT_TRANSPORT", "json")  # "json", "json-stream" or "multipart"
+    chat_transport_chunk_size: int = int(os.getenv("CHAT_TRANSPORT_CHUNK_SIZE", "65536"))  # bytes per streamed body chunk
+    chat_history_mode: str = os.getenv("CHAT_HISTORY_MODE", "full")  # "full" or "delta" (new turn + history hash)
     chat_model_support: List[str] = field(default_factory=lambda: ["claude", "llama", "gpt-oss"])
     max_response_tokens: int = int(os.getenv("MAX_RESPONSE_TOKENS", "512"))
     temperature: float = float(os.getenv("TEMPERATURE", "0.7"))
     top_p: float = float(os.getenv("TOP_P", "0.9"))
+    chat_context_budgets: Dict[str, int] = field(default_factory=lambda: {
+        model: int(budget)
+        for model, budget in (
+            item.split(":") for item in os.getenv("CHAT_CONTEXT_BUDGETS", "claude:100000,llama:32000,gpt-oss:32000").split(",") if item
+        )
+    })  # prompt token budget per model, 0 disables trimming
+    chat_context_default_budget: int = int(os.getenv("CHAT_CONTEXT_DEFAULT_BUDGET", "32000"))
+    chat_context_keep_messages: int = int(os.getenv("CHAT_CONTEXT_KEEP_MESSAGES", "4"))  # latest messages always sent
+    chat_summary_after_turns: int = int(os.getenv("CHAT_SUMMARY_AFTER_TURNS", "10"))  # 0 disables rolling summaries; not used in delta mode
+    chat_summary_keep_turns: int = int(os.getenv("CHAT_SUMMARY_KEEP_TURNS", "3"))  # recent turns always sent verbatim
+    chat_summary_max_sessions: int = int(os.getenv("CHAT_SUMMARY_MAX_SESSIONS", "1000"))  # cached summaries per process
+    stream_render_fps: float = float(os.getenv("STREAM_RENDER_FPS", "12"))  # max UI updates per second while streaming
+    stream_render_flush_bytes: int = int(os.getenv("STREAM_RENDER_FLUSH_BYTES", "4096"))  # flush early once this much text is pending
+    history_page_size: int = int(os.getenv("HISTORY_PAGE_SIZE", "20"))  # messages shown before "Load earlier", 0 shows all
 
     """Chat service endpoint."""
     chat_agent_completions_endpoint: str = "chat/agent/completions"
     chat_feedback_endpoint: str = "chat/feedback"
+    chat_feedback_batch_endpoint: str = "chat/feedback/batch"
+    chat_feedback_batch: bool = os.getenv("CHAT_FEEDBACK_BATCH", "false").lower() == "true"  # post several events to the batch endpoint
+    chat_files_endpoint: str = "chat/files"
+
+    """Feedback delivery."""
+    feedback_queue_size: int = int(os.getenv("FEEDBACK_QUEUE_SIZE", "1000"))
+    feedback_batch_size: int = int(os.getenv("FEEDBACK_BATCH_SIZE", "20"))
+    feedback_batch_interval_seconds: float = float(os.getenv("FEEDBACK_BATCH_INTERVAL_SECONDS", "2"))
+    feedback_max_retries: int = int(os.getenv("FEEDBACK_MAX_RETRIES", "5"))
+    feedback_backoff_seconds: float = float(os.getenv("FEEDBACK_BACKOFF_SECONDS", "1"))
+    feedback_backoff_max_seconds: float = float(os.getenv("FEEDBACK_BACKOFF_MAX_SECONDS", "30"))
+    feedback_spill_path: Path = Path(os.getenv("FEEDBACK_SPILL_PATH", "/var/log/cell-genai-chat-ui/feedback-spill.jsonl"))
 
 @dataclass
 class LogConfig(object):
@@ -62,6 +123,44 @@ class LogConfig(object):
 
     log_max_size: str = os.getenv("LOG_MAX_SIZE", "10485760")  # 10 MB
     log_max_backups: str = os.getenv("LOG_MAX_BACKUPS", "5")    # 5 backup files
+    log_dir: str = os.getenv("LOG_DIR", "/var/log/cell-genai-chat-ui")
+    log_level: str = os.getenv("LOG_LEVEL", "INFO")
+    log_file: bool = os.getenv("LOG_FILE", "true").lower() == "true"
+    log_stdout: bool = os.getenv("LOG_STDOUT", "false").lower() == "true"
+    log_async: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"  # write logs from a background thread
+    log_queue_size: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # records buffered before dropping
+    log_debug_sample_rate: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))  # fraction of debug records kept
+
+@dataclass
+class MetricsConfig(object):
+    """Metrics export configuration class."""
+
+    metrics_port: int = int(os.getenv("METRICS_PORT", "0"))  # 0 disables the /metrics endpoint
+    metrics_host: str = os.getenv("METRICS_HOST", "127.0.0.1")
+    metrics_file: str = os.getenv("METRICS_FILE", "")  # empty disables the metrics file
+    metrics_file_interval_seconds: float = float(os.getenv("METRICS_FILE_INTERVAL_SECONDS", "15"))
+
+@dataclass
+class WarmupConfig(object):
+    """Process warm-up configuration class."""
+
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "false").lower() == "true"
+    warmup_health_endpoint: str = os.getenv("WARMUP_HEALTH_ENDPOINT", "health")
+    warmup_connections: int = int(os.getenv("WARMUP_CONNECTIONS", "2"))  # pooled connections opened up front
+    warmup_timeout_seconds: float = float(os.getenv("WARMUP_TIMEOUT_SECONDS", "10"))
+    warmup_retry_seconds: float = float(os.getenv("WARMUP_RETRY_SECONDS", "15"))  # delay before retrying a failed warm-up
+    warmup_imports: List[str] = field(default_factory=lambda: [m.strip() for m in os.getenv("WARMUP_IMPORTS", "jwt,streamlit_authenticator,langchain_community.chat_message_histories").split(",") if m.strip()])
+
+@dataclass
+class ProfileConfig(object):
+    """Profiling configuration class."""
+
+    profile_mode: str = os.getenv("PROFILE_MODE", "off").lower()  # off, cprofile or sampling
+    profile_query_mode: str = os.getenv("PROFILE_QUERY_MODE", "sampling").lower()  # mode used for ?profile=1
+    profile_admin_roles: List[str] = field(default_factory=lambda: [r.strip() for r in os.getenv("PROFILE_ADMIN_ROLES", "admin").split(",") if r.strip()])
+    profile_dir: str = os.getenv("PROFILE_DIR", "/var/log/cell-genai-chat-ui/profiles")
+    profile_max_files: int = int(os.getenv("PROFILE_MAX_FILES", "20"))  # kept per page, oldest removed first
+    profile_sample_interval_ms: float = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
 
 @dataclass
 class ToolInfo:
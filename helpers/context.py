@@ -0,0 +1,86 @@
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+_tokenizers: Dict[str, Callable[[str], int]] = {}
+
+def register_tokenizer(chat_model: str, tokenizer: Callable[[str], int]):
+    """Register an exact token counter for a model (e.g. a tiktoken/HF encoder)."""
+    _tokenizers[chat_model] = lru_cache(maxsize=4096)(tokenizer)
+
+class TokenEstimator:
+    """Estimate message token counts, using a registered tokenizer when available."""
+
+    CHARS_PER_TOKEN = 4
+    MESSAGE_OVERHEAD = 4
+    IMAGE_TOKENS = 1600
+
+    def __init__(self, tokenizer: Optional[Callable[[str], int]] = None):
+        self.tokenizer = tokenizer
+
+    @classmethod
+    def for_model(cls, chat_model: str) -> "TokenEstimator":
+        return cls(_tokenizers.get(chat_model))
+
+    def count_text(self, text: str) -> int:
+        if self.tokenizer is not None:
+            return self.tokenizer(text)
+        return len(text) // self.CHARS_PER_TOKEN + 1
+
+    def count_message(self, message: dict) -> int:
+        content = message.get("content")
+        if isinstance(content, str):
+            return self.MESSAGE_OVERHEAD + self.count_text(content)
+
+        tokens = self.MESSAGE_OVERHEAD
+        for part in content or []:
+            if "text" in part:
+                tokens += self.count_text(part["text"])
+            elif part.get("type") == "image":
+                tokens += self.IMAGE_TOKENS
+            elif "document" in part:
+                # Base64 is 4/3 of the raw size; assume the document is mostly text.
+                data = part["document"].get("source", {}).get("bytes") or ""
+                tokens += (len(data) * 3 // 4) // self.CHARS_PER_TOKEN
+        return tokens
+
+class ContextWindow:
+    """Trim outgoing history to a token budget, keeping system and latest messages."""
+
+    def __init__(self, budget_tokens: int, reserve_tokens: int, keep_last: int, estimator: TokenEstimator):
+        self.budget_tokens = budget_tokens
+        self.reserve_tokens = reserve_tokens
+        self.keep_last = keep_last
+        self.estimator = estimator
+
+    def fit(self, messages: list) -> list:
+        """Return the newest contiguous window of `messages` that fits the budget."""
+        if self.budget_tokens <= 0:
+            return messages
+
+        pinned_from = max(len(messages) - self.keep_last, 0)
+        available = self.budget_tokens - self.reserve_tokens
+        keep = [False] * len(messages)
+
+        for i, message in enumerate(messages):
+            if i >= pinned_from or message["role"] == "system":
+                keep[i] = True
+                available -= self.estimator.count_message(message)
+
+        for i in range(pinned_from - 1, -1, -1):
+            if keep[i]:
+                continue
+            tokens = self.estimator.count_message(messages[i])
+            if tokens > available:
+                break
+            keep[i] = True
+            available -= tokens
+
+        return [message for i, message in enumerate(messages) if keep[i]]
+
+def get_context_window(chat_conf, chat_model: str) -> ContextWindow:
+    return ContextWindow(
+        budget_tokens=chat_conf.chat_context_budgets.get(chat_model, chat_conf.chat_context_default_budget),
+        reserve_tokens=chat_conf.max_response_tokens,
+        keep_last=chat_conf.chat_context_keep_messages,
+        estimator=TokenEstimator.for_model(chat_model),
+    )
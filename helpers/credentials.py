@@ -0,0 +1,75 @@
+import os
+import copy
+import threading
+import yaml
+from pathlib import Path
+from typing import Optional
+from yaml.loader import SafeLoader
+from helpers.loog import logger
+
+class CredentialStore:
+    """
+    Auth config with pre-hashed passwords.
+    The YAML file is parsed and bcrypt-hashed once, then served from memory
+    until its mtime changes. When hashed_path is set, the hashed form is also
+    written to disk so a restarted process can skip hashing entirely.
+    """
+
+    SOURCE_MTIME_KEY = "_source_mtime_ns"
+
+    def __init__(self, config_path: Path, hashed_path: Optional[Path] = None):
+        self.config_path = Path(config_path)
+        self.hashed_path = Path(hashed_path) if hashed_path else None
+        self._lock = threading.Lock()
+        self._config: Optional[dict] = None
+        self._mtime_ns: Optional[int] = None
+
+    def load(self) -> dict:
+        """Return a private copy of the hashed auth config."""
+        mtime_ns = os.stat(self.config_path).st_mtime_ns
+        if self._config is None or mtime_ns != self._mtime_ns:
+            with self._lock:
+                if self._config is None or mtime_ns != self._mtime_ns:
+                    self._config = self._load_hashed(mtime_ns)
+                    self._mtime_ns = mtime_ns
+        # Authenticate mutates credentials (login attempts etc.), so never share them.
+        return copy.deepcopy(self._config)
+
+    def _load_hashed(self, mtime_ns: int) -> dict:
+        config = self._read_hashed_file(mtime_ns)
+        if config is not None:
+            return config
+
+        with open(self.config_path) as file:
+            config = yaml.load(file, Loader=SafeLoader)
+        import streamlit_authenticator as stauth
+        stauth.Hasher.hash_passwords(config['credentials'])
+        logger.info(f"[FE-AUTH] Hashed credentials for {len(config['credentials'].get('usernames', {}))} users")
+
+        self._write_hashed_file(config, mtime_ns)
+        return config
+
+    def _read_hashed_file(self, mtime_ns: int) -> Optional[dict]:
+        if self.hashed_path is None or not self.hashed_path.exists():
+            return None
+        try:
+            with open(self.hashed_path) as file:
+                config = yaml.load(file, Loader=SafeLoader)
+            if config.pop(self.SOURCE_MTIME_KEY, None) != mtime_ns:
+                return None
+            return config
+        except Exception as e:
+            logger.warning(f"[FE-AUTH] Ignoring unreadable hashed credentials file: {e}")
+            return None
+
+    def _write_hashed_file(self, config: dict, mtime_ns: int):
+        if self.hashed_path is None:
+            return
+        try:
+            tmp_path = self.hashed_path.with_name(self.hashed_path.name + ".tmp")
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as file:
+                yaml.safe_dump({**config, self.SOURCE_MTIME_KEY: mtime_ns}, file)
+            os.replace(tmp_path, self.hashed_path)
+        except OSError as e:
+            logger.warning(f"[FE-AUTH] Unable to write hashed credentials file: {e}")
@@ -0,0 +1,122 @@
+import io
+import threading
+import multiprocessing
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+# Runs in worker processes: keep this module free of Streamlit/app imports.
+
+def _pdf_to_text(data: bytes) -> str:
+    from pypdf import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    return "\n\n".join((page.extract_text() or "").strip() for page in reader.pages)
+
+def _docx_to_text(data: bytes) -> str:
+    import docx
+    document = docx.Document(io.BytesIO(data))
+    blocks = [p.text for p in document.paragraphs if p.text.strip()]
+    for table in document.tables:
+        blocks.append(_markdown_table([[cell.text for cell in row.cells] for row in table.rows]))
+    return "\n\n".join(blocks)
+
+def _xlsx_to_text(data: bytes) -> str:
+    from openpyxl import load_workbook
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        blocks = []
+        for sheet in workbook.worksheets:
+            rows = [
+                ["" if value is None else str(value) for value in row]
+                for row in sheet.iter_rows(values_only=True)
+                if any(value is not None for value in row)
+            ]
+            if rows:
+                blocks.append(f"## {sheet.title}\n\n{_markdown_table(rows)}")
+        return "\n\n".join(blocks)
+    finally:
+        workbook.close()
+
+def _csv_to_text(data: bytes) -> str:
+    # CSV is already compact; just normalise the encoding.
+    return data.decode("utf-8-sig", errors="replace")
+
+def _markdown_table(rows: list) -> str:
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = []
+    for i, row in enumerate(rows):
+        cells = [cell.replace("|", "\\|").replace("\n", " ") for cell in row] + [""] * (width - len(row))
+        lines.append("| " + " | ".join(cells) + " |")
+        if i == 0:
+            lines.append("|" + " --- |" * width)
+    return "\n".join(lines)
+
+EXTRACTORS = {
+    "pdf": _pdf_to_text,
+    "docx": _docx_to_text,
+    "xlsx": _xlsx_to_text,
+    "csv": _csv_to_text,
+}
+
+def extract_text(data: bytes, extension: str, max_chars: int) -> Optional[str]:
+    """Convert a document to compact text, or return None if it is not supported."""
+    extractor = EXTRACTORS.get(extension)
+    if extractor is None:
+        return None
+    text = extractor(data).strip()
+    if len(text) > max_chars:
+        text = text[:max_chars] + "\n\n[truncated]"
+    return text or None
+
+class DocumentExtractor:
+    """Extract text from PDF/DOCX/XLSX/CSV uploads in a process pool."""
+
+    def __init__(self, enabled: bool, max_workers: int, max_chars: int, timeout_seconds: float):
+        self.enabled = enabled
+        self.max_workers = max_workers
+        self.max_chars = max_chars
+        self.timeout_seconds = timeout_seconds
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def supports(self, filename: str) -> bool:
+        return self.enabled and filename.rsplit(".", 1)[-1].lower() in EXTRACTORS
+
+    def extract(self, data: bytes, filename: str) -> Optional[str]:
+        """Run the extraction in a worker process and wait for the result."""
+        executor = self.executor
+        future = executor.submit(extract_text, data, filename.rsplit(".", 1)[-1].lower(), self.max_chars)
+        try:
+            return future.result(timeout=self.timeout_seconds)
+        except FutureTimeoutError:
+            # A running job ignores cancel(), so a stuck parse would keep its worker busy.
+            future.cancel()
+            self._recycle(executor)
+            raise
+
+    def _recycle(self, executor: ProcessPoolExecutor):
+        """
+        Replace the pool and kill its workers. Other jobs still running in the
+        old pool fail with BrokenProcessPool and fall back like any other error.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: forking the threaded Streamlit server is not safe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._executor
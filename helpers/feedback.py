@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import queue
+import atexit
+import random
+import shutil
+import threading
+from pathlib import Path
+from typing import Callable
+from helpers.loog import logger
+
+class PermanentDeliveryError(Exception):
+    """
+    Raised by `send_batch` when retrying cannot help, e.g. a 4xx from the backend.
+    `send_batch` may remove delivered events from the batch before raising;
+    only the events left in it are retried, spilled or rejected.
+    """
+
+class FeedbackDispatcher:
+    """
+    Deliver feedback events from a background thread.
+    UI callbacks only enqueue. The worker batches events, retries failed
+    deliveries with exponential backoff and, when the backend stays down,
+    spills them to a JSONL file that is replayed after the next success.
+    Batches rejected with PermanentDeliveryError go to a `.rejected` file
+    that is never replayed.
+    """
+
+    def __init__(
+        self,
+        send_batch: Callable[[list], None],
+        spill_path: Path,
+        max_queue: int = 1000,
+        batch_size: int = 20,
+        batch_interval_seconds: float = 2.0,
+        max_retries: int = 5,
+        backoff_seconds: float = 1.0,
+        backoff_max_seconds: float = 30.0,
+    ):
+        self.send_batch = send_batch
+        self.spill_path = Path(spill_path)
+        self.batch_size = batch_size
+        self.batch_interval_seconds = batch_interval_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._spill_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="feedback-dispatcher", daemon=True)
+        self._thread.start()
+        atexit.register(self._spill_pending)
+
+    def submit(self, event: dict) -> bool:
+        """Queue an event without blocking; spill it to disk if the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            logger.warning("[FE-FEEDBACK] Queue full, spilling feedback to disk")
+            self._spill([event])
+            return False
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_interval_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._deliver(batch)
+
+    def _deliver(self, batch: list):
+        if self._send_with_retries(batch):
+            self._replay_spilled()
+
+    def _send_with_retries(self, batch: list) -> bool:
+        """Send one batch; spill (or reject) it when delivery fails. Returns True on success."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.send_batch(batch)
+                return True
+            except PermanentDeliveryError as e:
+                logger.error(f"[FE-FEEDBACK] Backend rejected {len(batch)} events, not retrying: {e}")
+                self._reject(batch)
+                return False
+            except Exception as e:
+                delay = min(self.backoff_max_seconds, self.backoff_seconds * 2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning(f"[FE-FEEDBACK] Delivery failed (attempt {attempt + 1}): {e}")
+                if attempt < self.max_retries:
+                    time.sleep(delay)
+        logger.error(f"[FE-FEEDBACK] Giving up on {len(batch)} events, spilling to {self.spill_path}")
+        self._spill(batch)
+        return False
+
+    @property
+    def replay_path(self) -> Path:
+        return self.spill_path.with_name(self.spill_path.name + ".replay")
+
+    @property
+    def rejected_path(self) -> Path:
+        return self.spill_path.with_name(self.spill_path.name + ".rejected")
+
+    def _append(self, path: Path, events: list):
+        try:
+            with self._spill_lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with open(path, "a", encoding="utf-8") as file:
+                    for event in events:
+                        file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.error(f"[FE-FEEDBACK] Unable to write {len(events)} events to {path}: {e}")
+
+    def _spill(self, events: list):
+        self._append(self.spill_path, events)
+
+    def _reject(self, events: list):
+        for event in events:
+            logger.warning({"message": "[FE-FEEDBACK] Feedback event rejected", "event": event})
+        self._append(self.rejected_path, events)
+
+    def _claim_spilled(self) -> bool:
+        """
+        Move spilled events into the replay file.
+        A replay file left by an interrupted replay is kept and the new spill
+        is appended to it, so no events are overwritten.
+        """
+        with self._spill_lock:
+            if self.spill_path.exists() and self.spill_path.stat().st_size > 0:
+                if self.replay_path.exists():
+                    with open(self.spill_path, "rb") as source, open(self.replay_path, "ab") as target:
+                        shutil.copyfileobj(source, target)
+                    os.remove(self.spill_path)
+                else:
+                    os.replace(self.spill_path, self.replay_path)
+            return self.replay_path.exists() and self.replay_path.stat().st_size > 0
+
+    def _read_replay(self) -> list:
+        events = []
+        with open(self.replay_path, encoding="utf-8") as file:
+            for number, line in enumerate(file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    logger.warning(f"[FE-FEEDBACK] Skipping corrupt spilled event at {self.replay_path}:{number}: {e}")
+        return events
+
+    def _replay_spilled(self):
+        """Resend spilled events once the backend is reachable again."""
+        try:
+            if not self._claim_spilled():
+                return
+            events = self._read_replay()
+        except OSError as e:
+            logger.error(f"[FE-FEEDBACK] Unable to read spilled feedback: {e}")
+            return
+
+        delivered = 0
+        for start in range(0, len(events), self.batch_size):
+            batch = events[start:start + self.batch_size]
+            size = len(batch)
+            try:
+                self.send_batch(batch)
+                delivered += size
+            except PermanentDeliveryError as e:
+                delivered += size - len(batch)
+                logger.error(f"[FE-FEEDBACK] Backend rejected {len(batch)} spilled events: {e}")
+                self._reject(batch)
+            except Exception as e:
+                delivered += size - len(batch)
+                remaining = batch + events[start + size:]
+                logger.warning(f"[FE-FEEDBACK] Replay failed, keeping {len(remaining)} events spilled: {e}")
+                self._spill(remaining)
+                break
+        try:
+            os.remove(self.replay_path)
+        except OSError as e:
+            logger.error(f"[FE-FEEDBACK] Unable to remove {self.replay_path}: {e}")
+        if delivered:
+            logger.info(f"[FE-FEEDBACK] Replayed {delivered} spilled events from {self.spill_path}")
+
+    def _spill_pending(self):
+        pending = []
+        while True:
+            try:
+                pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if pending:
+            self._spill(pending)
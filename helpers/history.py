@@ -0,0 +1,64 @@
+import json
+import hashlib
+import streamlit as st
+from typing import MutableMapping, Optional
+
+UI_ONLY_KEY = "ui_only"
+
+def is_ui_only(message) -> bool:
+    """True for messages shown in the chat but never sent to the backend (e.g. the greeting)."""
+    return bool(getattr(message, "additional_kwargs", {}).get(UI_ONLY_KEY))
+
+class HistoryDigest:
+    """
+    Chained SHA-256 digest of the chat history, used by the delta protocol.
+
+    digest_0 = sha256("")
+    digest_n = sha256(digest_{n-1} + canonical_json({"role": ..., "content": ...}))
+
+    Roles are "user"/"assistant" and content is the plain text of the turn,
+    so the backend can compute the same value over its stored transcript.
+    The chain starts at `offset`: after a trimmed full resend the backend only
+    holds the turns from that point on. The running digest is kept per session
+    and only extended with new turns.
+    """
+
+    SESSION_KEY = "history_digest"
+    EMPTY = hashlib.sha256(b"").hexdigest()
+
+    @staticmethod
+    def extend(digest: str, role: str, content: str) -> str:
+        message = json.dumps({"role": role, "content": content}, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256((digest + message).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def offset(cls, chat_session_id: str, state: Optional[MutableMapping] = None) -> int:
+        """Number of leading turns the backend does not hold for this session."""
+        state = st.session_state if state is None else state
+        cached = state.get(cls.SESSION_KEY)
+        if cached and cached["chat_session_id"] == chat_session_id:
+            return cached["offset"]
+        return 0
+
+    @classmethod
+    def compute(cls, chat_session_id: str, messages: list, offset: int = 0, state: Optional[MutableMapping] = None) -> tuple[int, str]:
+        """Return (version, digest) for `messages[offset:]`, reusing the cached prefix digest."""
+        state = st.session_state if state is None else state
+        cached = state.get(cls.SESSION_KEY)
+        if (
+            cached
+            and cached["chat_session_id"] == chat_session_id
+            and cached["offset"] == offset
+            and cached["version"] <= len(messages)
+        ):
+            version, digest = cached["version"], cached["digest"]
+        else:
+            version, digest = offset, cls.EMPTY
+
+        for m in messages[version:]:
+            role = "user" if m.type == "human" else "assistant"
+            digest = cls.extend(digest, role, m.content)
+
+        version = len(messages)
+        state[cls.SESSION_KEY] = {"chat_session_id": chat_session_id, "offset": offset, "version": version, "digest": digest}
+        return version, digest
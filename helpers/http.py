@@ -1,142 +1,380 @@
+import time
+import uuid
+import codecs
+import socket
+import threading
 import requests
 import streamlit as st
+from typing import Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from helpers.feedback import PermanentDeliveryError
 from helpers.loog import logger
 from helpers.secret import AWSSecretManager
-from helpers.utils import Utils
+from dataclasses import replace
+from helpers.utils import FileMetadata, FileProcessStatus
+from helpers.attachments import UploadTracker
+from helpers.transport import MultipartBody, iter_json_body
+from helpers.adapters import get_adapter
+from helpers.history import HistoryDigest, is_ui_only
+from helpers.context import TokenEstimator, get_context_window
+from helpers.metrics import CHAT_CONNECT_SECONDS, CHAT_STAGE_SECONDS, CHAT_TOKENS_PER_SECOND, timer
+from helpers.summary import ConversationSummarizer
 from helpers.config import AppConfig, AWSConfig, ChatConfig
 
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with timer(CHAT_CONNECT_SECONDS, host=self.host):
+            super().connect()
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        with timer(CHAT_CONNECT_SECONDS, host=self.host):
+            super().connect()
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+class TimedAdapter(HTTPAdapter):
+    """HTTP adapter whose pools record the setup time of every new connection."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+class KeepAliveAdapter(TimedAdapter):
+    """HTTP adapter that enables TCP keepalive on pooled connections."""
+
+    def __init__(self, keep_alive_idle_seconds: int, **kwargs):
+        self.keep_alive_idle_seconds = keep_alive_idle_seconds
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        socket_options = list(HTTPConnection.default_socket_options)
+        socket_options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keep_alive_idle_seconds))
+        kwargs["socket_options"] = socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+def get_http_session(chat_conf: ChatConfig) -> requests.Session:
+    """
+    Return the process-wide pooled session used for all chat service calls.
+    The connection pool is thread-safe, so the session is shared by every
+    Streamlit script thread instead of opening a connection per request.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                if chat_conf.chat_keep_alive:
+                    adapter = KeepAliveAdapter(
+                        keep_alive_idle_seconds=chat_conf.chat_keep_alive_idle_seconds,
+                        pool_connections=chat_conf.chat_pool_connections,
+                        pool_maxsize=chat_conf.chat_pool_maxsize,
+                    )
+                else:
+                    adapter = TimedAdapter(
+                        pool_connections=chat_conf.chat_pool_connections,
+                        pool_maxsize=chat_conf.chat_pool_maxsize,
+                    )
+                    session.headers["Connection"] = "close"
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+def close_http_session():
+    """Close the shared session and drop its pooled connections."""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
+
 class MakeRequest(object):
-    def __init__(self, app_conf: AppConfig, aws_conf: AWSConfig, chat_conf: ChatConfig):
+    def __init__(self, app_conf: AppConfig, aws_conf: AWSConfig, chat_conf: ChatConfig, aws_secret_manager: Optional[AWSSecretManager] = None):
         self.app_conf = app_conf
         self.aws_conf = aws_conf
         self.chat_conf = chat_conf
-        self.aws_secret_manager = AWSSecretManager(app_conf, aws_conf)
+        self.aws_secret_manager = aws_secret_manager or AWSSecretManager(app_conf, aws_conf)
+        self.summarizer = ConversationSummarizer(
+            complete=self.complete,
+            after_messages=chat_conf.chat_summary_after_turns * 2,
+            keep_messages=chat_conf.chat_summary_keep_turns * 2,
+            max_sessions=chat_conf.chat_summary_max_sessions,
+        )
+        self.uploads = UploadTracker(ttl_seconds=chat_conf.chat_attachment_reference_ttl_seconds)
+        self._feedback_batch_supported = True
+
+    @property
+    def session(self) -> requests.Session:
+        return get_http_session(self.chat_conf)
+
+    def _headers(self) -> dict:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.aws_secret_manager.get_secret(self.chat_conf.chat_auth_key_name)}",
+        }
+
+    @property
+    def stream_timeout(self) -> tuple:
+        """(connect, idle) timeout for streamed responses."""
+        return (self.chat_conf.chat_connect_timeout_seconds, self.chat_conf.chat_stream_idle_timeout_seconds)
+
+    @property
+    def request_timeout(self) -> tuple:
+        """(connect, read) timeout for regular requests."""
+        return (self.chat_conf.chat_connect_timeout_seconds, self.chat_conf.chat_read_timeout_seconds)
 
     def stream_chat_completions(self, chat_model: str, history: dict, prompt: str, attachments: list):
         """
         Stream tokens from backend API (StreamingResponse).
         """
 
-        messages = []
-
-        if chat_model == "claude":
-            messages = [
-                    {"role": "user" if m.type == "human" else "assistant", "content": m.content}
-                    for m in history.messages
-                ]
-        
-            if attachments:
-                for attachment in attachments:
-                    if attachment.status.value == "completed":
-                        if attachment.is_image and attachment.base64:
-                            messages = messages + [
-                                {
-                                    "role": "user", 
-                                    "content": [
-                                        {
-                                            "type": "text", 
-                                            "text": prompt
-                                        },
-                                        {
-                                            "type": "image",
-                                            "source": {
-                                                "type": "base64",
-                                                "media_type": attachment.type,
-                                                "data": attachment.base64,
-                                            },
-                                        },
-                                    ]
-                                }
-                            ]
-                        elif attachment.is_document and attachment.base64:
-                            messages = messages + [
-                                {
-                                    "role": "user", 
-                                    "content": [
-                                        {
-                                            "type": "text", 
-                                            "text": prompt
-                                        },
-                                        {
-                                            "document": {
-                                                # Available formats: html, md, pdf, doc/docx, xls/xlsx, csv, and txt
-                                                "format": Utils.get_file_format(attachment.type),
-                                                "name": Utils.format_filename(attachment.name),
-                                                "source": {"bytes": attachment.base64}, #(convert bytes → base64 string) for sending over HTTP
-                                            }
-                                        },
-                                    ]
-                                }
-                            ]
-                        elif attachment.is_text and attachment.content:
-                            messages = messages + [
-                                {
-                                    "role": "user", 
-                                    "content": [
-                                        {
-                                            "type": "text", 
-                                            "text": prompt
-                                        },
-                                        {
-                                            "type": "text", 
-                                            "text": attachment.content
-                                        },
-                                    ]
-                                }
-                            ]
-                        else:
-                            pass
-            else:
-                messages = messages + [{"role": "user", "content": prompt}]
-        elif chat_model == "llama":
-            st.toast(f"Model : {chat_model} currently not supported", icon="⚠️")
-            st.stop()
-        elif chat_model == "gpt-oss":
-            st.toast(f"Model : {chat_model} currently not supported", icon="⚠️")
-            st.stop()
-        else:
+        started = time.perf_counter()
+        adapter = get_adapter(chat_model)
+        if adapter is None:
             st.toast(f"Model : {chat_model} currently not supported", icon="⚠️")
             st.stop()
 
-        if isinstance(messages, tuple):
-            messages = list(messages)
+        for attachment in attachments or []:
+            if attachment.status == FileProcessStatus.COMPLETED and not adapter.supports(attachment):
+                st.toast(f"Attachment {attachment.name} is not supported by {chat_model}", icon="⚠️")
+
+        if self.chat_conf.chat_attachment_references and attachments:
+            attachments = [self.reference_attachment(attachment) for attachment in attachments]
+
+        history_messages = history.messages
+        if self.chat_conf.chat_history_mode == "delta":
+            # UI-only turns (the greeting) are never part of the transcript the backend hashes.
+            history_messages = [m for m in history_messages if not is_ui_only(m)]
+
+        messages = adapter.build_messages(history_messages, prompt, attachments)
 
         chat_session = st.session_state.get("chat_session_id")
 
+        if self.chat_conf.chat_history_mode != "delta":
+            # In delta mode the backend owns the history; the full resend is trimmed on a 409 instead.
+            history_len = len(history_messages)
+            messages = self.summarizer.apply(str(chat_session), chat_model, messages[:history_len]) + messages[history_len:]
+            messages = get_context_window(self.chat_conf, chat_model).fit(messages)
+
         payload = {
             "chat_session_id": str(chat_session),
             "model_name": chat_model,
             "messages": messages,
+            "max_tokens": self.chat_conf.max_response_tokens,
+            "temperature": self.chat_conf.temperature,
+            "top_p": self.chat_conf.top_p,
         }
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.aws_secret_manager.get_secret(self.chat_conf.chat_auth_key_name)}",
-        }
+        delta_payload = None
+        if self.chat_conf.chat_history_mode == "delta":
+            history_offset = min(HistoryDigest.offset(str(chat_session)), len(history_messages))
+            history_version, history_hash = HistoryDigest.compute(str(chat_session), history_messages, history_offset)
+            delta_payload = {
+                **payload,
+                "history_mode": "delta",
+                "history_version": history_version,
+                "history_hash": history_hash,
+                "history_offset": history_offset,
+                "messages": messages[len(history_messages):],
+            }
+
+        CHAT_STAGE_SECONDS.observe(time.perf_counter() - started, stage="payload_build", model=chat_model)
+
+        with timer(CHAT_STAGE_SECONDS, stage="secret_fetch", model=chat_model):
+            headers = self._headers()
 
+        sent = time.perf_counter()
+        first_token = None
+        streamed_chars = 0
         try:
-            with requests.post(self.chat_conf.chat_service_api + self.chat_conf.chat_agent_completions_endpoint, headers=headers, json=payload, stream=True, timeout=self.chat_conf.chat_timeout_seconds) as r:
+            r = self._post_stream(headers, delta_payload or payload)
+            if delta_payload is not None and r.status_code == 409:
+                # Backend history differs from ours: resend the transcript, trimmed to the budget.
+                r.close()
+                logger.info(f"[FE-CHAT_SERVICE] History mismatch for session {chat_session}, sending full history")
+                r = self._post_stream(headers, self._resync_payload(payload, chat_model, history_messages))
+            CHAT_STAGE_SECONDS.observe(time.perf_counter() - sent, stage="ttfb", model=chat_model)
+
+            with r:
                 r.raise_for_status()
+                # Incremental decoding: a chunk may end inside a multi-byte character.
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
                 for chunk in r.iter_content(chunk_size=None):
-                    if chunk:
-                        yield chunk.decode("utf-8")
+                    text = decoder.decode(chunk) if chunk else ""
+                    if text:
+                        if first_token is None:
+                            first_token = time.perf_counter()
+                            CHAT_STAGE_SECONDS.observe(first_token - sent, stage="ttft", model=chat_model)
+                        streamed_chars += len(text)
+                        yield text
+                text = decoder.decode(b"", final=True)
+                if text:
+                    yield text
         except requests.exceptions.RequestException as e:
             logger.error(f"[FE-CHAT_SERVICE] Stream error: {e}")
             yield f"\n[Error] Unable connect to chat service. Please try again."
+        finally:
+            finished = time.perf_counter()
+            CHAT_STAGE_SECONDS.observe(finished - started, stage="total", model=chat_model)
+            if first_token is not None and finished > first_token:
+                tokens = streamed_chars // TokenEstimator.CHARS_PER_TOKEN
+                CHAT_TOKENS_PER_SECOND.observe(tokens / (finished - first_token), model=chat_model)
+
+    def _resync_payload(self, payload: dict, chat_model: str, history_messages: list) -> dict:
+        """
+        Full resend for delta mode, trimmed to the context budget.
+        `history_offset` is the number of leading turns left out; the hash
+        covers the turns from there on, and later deltas chain from the same
+        point so the backend can resync on what it was sent.
+        """
+        messages = payload["messages"]
+        fitted = get_context_window(self.chat_conf, chat_model).fit(messages)
+        # Never trim into the new turn.
+        history_offset = min(len(messages) - len(fitted), len(history_messages))
+        history_version, history_hash = HistoryDigest.compute(payload["chat_session_id"], history_messages, history_offset)
+        return {
+            **payload,
+            "history_mode": "full",
+            "history_version": history_version,
+            "history_hash": history_hash,
+            "history_offset": history_offset,
+            "messages": messages[history_offset:],
+        }
+
+    def complete(self, chat_model: str, messages: list) -> str:
+        """
+        Run a one-off completion and return the whole response text.
+        Uses a throwaway chat_session_id so it never touches a user's history.
+        Safe to call from background threads.
+        """
+        payload = {
+            "chat_session_id": str(uuid.uuid4()),
+            "model_name": chat_model,
+            "messages": messages,
+            "max_tokens": self.chat_conf.max_response_tokens,
+            "temperature": self.chat_conf.temperature,
+            "top_p": self.chat_conf.top_p,
+        }
+        headers = self._headers()
+        with self._post_stream(headers, payload) as r:
+            r.raise_for_status()
+            r.encoding = "utf-8"
+            return "".join(r.iter_content(chunk_size=None, decode_unicode=True))
+
+    def reference_attachment(self, attachment: FileMetadata) -> FileMetadata:
+        """
+        Make sure the backend holds this attachment and return a copy that is
+        sent by the SHA-256 of its processed bytes instead of inline. Falls
+        back to inline on error.
+        """
+        if attachment.status != FileProcessStatus.COMPLETED or not attachment.content_sha256 or not attachment.base64:
+            return attachment
+
+        if not self.uploads.is_uploaded(attachment.content_sha256):
+            url = self.chat_conf.chat_service_api + self.chat_conf.chat_files_endpoint
+            try:
+                r = self.session.head(f"{url}/{attachment.content_sha256}", headers=self._headers(), timeout=self.request_timeout)
+                if r.status_code == 404:
+                    r = self.session.post(url, timeout=self.request_timeout, **self._request_body(self._headers(), {
+                        "sha256": attachment.content_sha256,
+                        "name": attachment.name,
+                        "media_type": attachment.type,
+                        "data": attachment.base64,
+                    }))
+                r.raise_for_status()
+                self.uploads.mark_uploaded(attachment.content_sha256)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"[FE-CHAT_SERVICE] Attachment upload failed, sending inline: {e}")
+                return attachment
+
+        return replace(attachment, reference=True)
+
+    def _request_body(self, headers: dict, payload: dict) -> dict:
+        """
+        Return the requests keyword arguments carrying `payload`.
+        "json-stream" and "multipart" send a generator body (chunked transfer)
+        so attachments are not copied into one big serialized document.
+        """
+        transport = self.chat_conf.chat_transport
+        if transport == "json-stream":
+            return {"headers": headers, "data": iter_json_body(payload, self.chat_conf.chat_transport_chunk_size)}
+        if transport == "multipart":
+            body = MultipartBody(payload, self.chat_conf.chat_transport_chunk_size)
+            return {"headers": {**headers, "Content-Type": body.content_type}, "data": iter(body)}
+        return {"headers": headers, "json": payload}
+
+    def _post_stream(self, headers: dict, payload: dict) -> requests.Response:
+        return self.session.post(self.chat_conf.chat_service_api + self.chat_conf.chat_agent_completions_endpoint, stream=True, timeout=self.stream_timeout, **self._request_body(headers, payload))
     
     def post(self, endpoint: str, data: dict):
         """
         Send a POST request to the specified endpoint with the given data.
         """
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.aws_secret_manager.get_secret(self.chat_conf.chat_auth_key_name)}",
-        }
+        headers = self._headers()
         try:
-            response = requests.post(self.chat_conf.chat_service_api + endpoint, headers=headers, json=data, timeout=self.chat_conf.chat_timeout_seconds)
+            response = self.session.post(self.chat_conf.chat_service_api + endpoint, headers=headers, json=data, timeout=self.request_timeout)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             logger.error(f"[FE-CHAT_SERVICE] POST error: {e}")
-            yield f"\n[Error] Unable connect to chat service. Please try again."
-            
\ No newline at end of file
+            return None
+
+    def send_feedback(self, events: list):
+        """
+        Deliver feedback events; raises on failure so the caller can retry.
+        With CHAT_FEEDBACK_BATCH on, several events go to the batch endpoint;
+        otherwise, or when the backend does not have it, each event is posted
+        to the original feedback endpoint. Delivered events are removed from
+        `events`, so a retry only resends the rest.
+        """
+        if self.chat_conf.chat_feedback_batch and self._feedback_batch_supported and len(events) > 1:
+            endpoint = self.chat_conf.chat_feedback_batch_endpoint
+            response = self._post_feedback(endpoint, {"items": list(events)})
+            if response.status_code not in (404, 405, 501):
+                self._check_feedback_response(response, endpoint)
+                events.clear()
+                return
+            logger.warning(f"[FE-FEEDBACK] {endpoint} returned {response.status_code}, posting events one by one")
+            self._feedback_batch_supported = False
+
+        endpoint = self.chat_conf.chat_feedback_endpoint
+        rejected = []
+        try:
+            while events:
+                try:
+                    self._check_feedback_response(self._post_feedback(endpoint, events[0]), endpoint)
+                except PermanentDeliveryError:
+                    rejected.append(events[0])
+                events.pop(0)
+        finally:
+            events[:0] = rejected
+        if rejected:
+            raise PermanentDeliveryError(f"{len(rejected)} events rejected by {endpoint}")
+
+    def _post_feedback(self, endpoint: str, data: dict) -> requests.Response:
+        return self.session.post(self.chat_conf.chat_service_api + endpoint, headers=self._headers(), json=data, timeout=self.request_timeout)
+
+    def _check_feedback_response(self, response: requests.Response, endpoint: str):
+        if response.status_code in (401, 403):
+            # Likely a rotated token: refetch the secret and let the caller retry.
+            self.aws_secret_manager.cache.invalidate(self.aws_conf.aws_secret_name)
+            raise requests.exceptions.HTTPError(f"{response.status_code} from {endpoint}", response=response)
+        # Other 4xx (apart from timeouts and rate limiting) will not succeed on retry.
+        if 400 <= response.status_code < 500 and response.status_code not in (408, 425, 429):
+            raise PermanentDeliveryError(f"{response.status_code} from {endpoint}")
+        response.raise_for_status()
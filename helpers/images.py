@@ -0,0 +1,116 @@
+import io
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+from helpers.loog import logger
+
+Image = None
+ImageOps = None
+
+ORIENTATION = 0x0112  # EXIF orientation tag
+
+def _load_pil() -> bool:
+    """Import Pillow on first use; image preprocessing is optional."""
+    global Image, ImageOps
+    if Image is None:
+        try:
+            from PIL import Image, ImageOps
+        except ImportError:
+            return False
+    return True
+
+class ImagePreprocessor:
+    """
+    Downscale and re-encode images before upload.
+    Images are limited to `max_dimension` on the long edge and `max_pixels` in
+    total (what the vision model uses anyway), re-encoded at `quality` and
+    saved without EXIF/ICC metadata. Images that need no resize or rotation
+    are sent as uploaded unless re-encoding makes them smaller, and opaque
+    PNGs only become JPEG when that shrinks them. Results are cached by
+    content hash.
+    """
+
+    def __init__(self, max_dimension: int, max_pixels: int, quality: int, cache_size: int = 128, enabled: bool = True):
+        self.max_dimension = max_dimension
+        self.max_pixels = max_pixels
+        self.quality = quality
+        self.cache_size = cache_size
+        self.enabled = enabled and _load_pil()
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[str, tuple[bytes, str]]" = OrderedDict()
+
+    def process(self, data: bytes, media_type: str) -> tuple[bytes, str]:
+        """Return (image bytes, media type) ready to send."""
+        if not self.enabled:
+            return data, media_type
+
+        key = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+
+        try:
+            result = self._reencode(data, media_type)
+        except Exception as e:
+            logger.warning(f"[FE-FILE_PROCESSING] Image preprocessing failed, sending original : {e}")
+            return data, media_type
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def thumbnail(self, data: bytes, size: int) -> Optional[bytes]:
+        """Return a small PNG preview of an image, or None if Pillow is unavailable."""
+        if not _load_pil():
+            return None
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.thumbnail((size, size))
+                output = io.BytesIO()
+                image.save(output, format="PNG")
+                return output.getvalue()
+        except Exception as e:
+            logger.warning(f"[FE-FILE_PROCESSING] Unable to build thumbnail : {e}")
+            return None
+
+    def _reencode(self, data: bytes, media_type: str) -> tuple[bytes, str]:
+        with Image.open(io.BytesIO(data)) as source:
+            is_png = source.format == "PNG"
+            rotated = source.getexif().get(ORIENTATION, 1) != 1
+            # Apply EXIF orientation before the metadata is dropped.
+            image = ImageOps.exif_transpose(source)
+
+            width, height = image.size
+            scale = min(
+                1.0,
+                self.max_dimension / max(width, height),
+                math.sqrt(self.max_pixels / (width * height)),
+            )
+            if scale < 1.0:
+                image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.LANCZOS)
+
+            has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+            if has_alpha:
+                result = self._encode(image, "PNG"), "image/png"
+            else:
+                result = self._encode(image.convert("RGB"), "JPEG"), "image/jpeg"
+                if is_png and len(result[0]) >= len(data):
+                    result = self._encode(image, "PNG"), "image/png"
+
+            if scale == 1.0 and not rotated and len(result[0]) >= len(data):
+                return data, media_type
+            return result
+
+    def _encode(self, image, format: str) -> bytes:
+        output = io.BytesIO()
+        if format == "JPEG":
+            image.save(output, format="JPEG", quality=self.quality, optimize=True, progressive=True)
+        else:
+            image.save(output, format="PNG", optimize=True)
+        return output.getvalue()
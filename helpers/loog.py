@@ -1,10 +1,19 @@
-import logging
-from logging.handlers import RotatingFileHandler
+import os
+import sys
+import copy
 import json
+import queue
+import atexit
+import random
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime, timezone
-from helpers.config import AppConfig
+from helpers.config import LogConfig
 
-config = AppConfig()
+config = LogConfig()
+_setup_lock = threading.Lock()
+_configured = False
 
 class CustomFormatter(logging.Formatter):
     def formatLevel(self, record):
@@ -28,23 +37,114 @@ class CustomFormatter(logging.Formatter):
     def formatTime(self, record, datefmt=None):
         dt = datetime.fromtimestamp(record.created, tz=timezone.utc)
         return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Non-blocking QueueHandler: when the queue is full the record is dropped
+    and counted instead of stalling the caller. Formatting is left to the
+    listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self._unreported:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    'name': record.name,
+                    'levelno': logging.WARNING,
+                    'levelname': 'WARNING',
+                    'msg': f"[FE-LOG] Dropped {self._unreported} log records, queue full",
+                }))
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate
     
 def create_log_directory():
-    import os
-    log_dir = '/var/log/cell-genai-chat-ui'
+    log_dir = config.log_dir
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
         os.chmod(log_dir, 0o755)
 
+class BootstrapFilter(logging.Filter):
+    """
+    Installed on the logger at import time: the log directory, file handlers
+    and listener thread are only created when the first record is logged,
+    keeping them off the cold-start path. Logger filters run before handler
+    dispatch, so the first record goes through the real handlers exactly once.
+    """
+
+    def filter(self, record):
+        if not _configured:
+            setup_logging()
+        return True
+
 def setup_logging():
+    global _configured
     logger = logging.getLogger('cell-genai-chat-ui')
-    logger.setLevel(logging.INFO)
+    with _setup_lock:
+        if _configured:
+            return
+        _configured = True
+        _configure(logger)
+
+def _configure(logger: logging.Logger):
     formatter = CustomFormatter(json.dumps({'level': '%(levelname)s', 'msg': '%(message)s', 'time': '%(asctime)s'}))
-    handler = RotatingFileHandler('/var/log/cell-genai-chat-ui/app.log', maxBytes=int(float(config.log_max_size)), backupCount=int(float(config.log_max_backups)))
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-
-# setup logging for script
-create_log_directory()
-setup_logging()
-logger = logging.getLogger('cell-genai-chat-ui')
\ No newline at end of file
+
+    handlers = []
+    if config.log_file:
+        create_log_directory()
+        handlers.append(RotatingFileHandler(os.path.join(config.log_dir, 'app.log'), maxBytes=int(float(config.log_max_size)), backupCount=int(float(config.log_max_backups))))
+    if config.log_stdout:
+        handlers.append(logging.StreamHandler(sys.stdout))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    if config.log_debug_sample_rate < 1.0:
+        logger.addFilter(DebugSampler(config.log_debug_sample_rate))
+
+    if config.log_async:
+        # File I/O, JSON formatting and rotation happen on the listener thread.
+        log_queue = queue.Queue(maxsize=config.log_queue_size)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(DroppingQueueHandler(log_queue))
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
+
+def get_log_stats() -> dict:
+    """Return queue depth and drop counters of the async logging pipeline."""
+    for handler in logging.getLogger('cell-genai-chat-ui').handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            return {'queued': handler.queue.qsize(), 'dropped': handler.dropped}
+    return {'queued': 0, 'dropped': 0}
+
+# Real handlers are set up on the first record (see BootstrapFilter).
+logger = logging.getLogger('cell-genai-chat-ui')
+logger.setLevel(config.log_level.upper())
+if not any(isinstance(f, BootstrapFilter) for f in logger.filters):
+    logger.addFilter(BootstrapFilter())
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from helpers.loog import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_BUCKETS = (1, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+class Histogram:
+    """Thread-safe Prometheus-style histogram with labels."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def totals(self, **labels) -> Tuple[float, int]:
+        """Return (sum, count) of all series matching `labels`."""
+        total, count = 0.0, 0
+        with self._lock:
+            for key, series in self._series.items():
+                if all(item in key for item in labels.items()):
+                    total += series[1]
+                    count += series[2]
+        return total, count
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = [f'{k}="{self._escape(v)}"' for k, v in key]
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{self._labels(labels, bound)} {bucket_count}")
+                lines.append(f"{self.name}_bucket{self._labels(labels, '+Inf')} {count}")
+                suffix = self._labels(labels)
+                lines.append(f"{self.name}_sum{suffix} {total}")
+                lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+    @staticmethod
+    def _escape(value) -> str:
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    @staticmethod
+    def _labels(labels: list, le=None) -> str:
+        if le is not None:
+            labels = labels + [f'le="{le}"']
+        return "{" + ",".join(labels) + "}" if labels else ""
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+
+    def histogram(self, name: str, help_text: str = "", buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(name, help_text, buckets)
+            return histogram
+
+    def render(self) -> str:
+        with self._lock:
+            histograms = list(self._histograms.values())
+        return "\n".join(line for histogram in histograms for line in histogram.render()) + "\n"
+
+REGISTRY = MetricsRegistry()
+
+CHAT_STAGE_SECONDS = REGISTRY.histogram("cell_chat_stage_seconds", "Chat turn stage latency (secret_fetch, payload_build, ttfb, ttft, total).")
+CHAT_TOKENS_PER_SECOND = REGISTRY.histogram("cell_chat_tokens_per_second", "Estimated streamed tokens per second after the first token.", RATE_BUCKETS)
+CHAT_CONNECT_SECONDS = REGISTRY.histogram("cell_chat_connect_seconds", "New TCP/TLS connection setup time to the chat service.")
+ATTACHMENT_PROCESS_SECONDS = REGISTRY.histogram("cell_attachment_process_seconds", "Time to process one uploaded attachment.")
+AUTH_JWT_VERIFY_SECONDS = REGISTRY.histogram("cell_auth_jwt_verify_seconds", "JWT cookie verification time.")
+PAGE_RUN_SECONDS = REGISTRY.histogram("cell_page_run_seconds", "Streamlit page script run time.")
+
+@contextmanager
+def timer(histogram: Histogram, **labels):
+    """Observe the wall time of the enclosed block."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+_readiness_check: Optional[Callable[[], Tuple[bool, dict]]] = None
+
+def set_readiness_check(check: Optional[Callable[[], Tuple[bool, dict]]]):
+    """Register the callable behind /ready; without one the process is always ready."""
+    global _readiness_check
+    _readiness_check = check
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        route = self.path.split("?")[0]
+        if route == "/ready":
+            self._send_ready()
+            return
+        if route != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_ready(self):
+        ready, details = _readiness_check() if _readiness_check is not None else (True, {})
+        body = json.dumps({"ready": ready, **details}).encode("utf-8")
+        self.send_response(200 if ready else 503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+def _write_metrics_file(path: str, interval_seconds: float):
+    while True:
+        time.sleep(interval_seconds)
+        try:
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                file.write(REGISTRY.render())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"[FE-METRICS] Unable to write metrics file: {e}")
+
+def start_metrics_exporter(port: int, host: str = "127.0.0.1", path: Optional[str] = None, interval_seconds: float = 15):
+    """
+    Start the exporters once per process: an HTTP /metrics (and /ready)
+    endpoint when `port` is set and/or a periodically rewritten file when
+    `path` is set.
+    """
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    if port:
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info(f"[FE-METRICS] Serving metrics on http://{host}:{port}/metrics")
+        except OSError as e:
+            logger.warning(f"[FE-METRICS] Unable to start metrics endpoint: {e}")
+    if path:
+        threading.Thread(target=_write_metrics_file, args=(path, interval_seconds), name="metrics-file", daemon=True).start()
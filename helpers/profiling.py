@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from pathlib import Path
+from collections import Counter
+from typing import Iterable, Optional
+from helpers.config import ProfileConfig
+from helpers.loog import logger
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+class SamplingProfiler:
+    """
+    Low-overhead stack sampler for a single thread.
+    A daemon thread reads the target thread's frame every interval and
+    counts collapsed stacks, ready for flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.samples = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path: Path):
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+class RunProfiler:
+    """Profile one script rerun and write the result under a per-page directory."""
+
+    def __init__(self, conf: ProfileConfig, mode: str):
+        self.conf = conf
+        self.mode = mode
+        self.started = time.perf_counter()
+        if mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one cProfile per process; concurrent reruns are sampled instead.
+                self.mode = mode = "sampling"
+        if mode == "sampling":
+            self._profiler = SamplingProfiler(conf.profile_sample_interval_ms / 1000)
+            self._profiler.start()
+
+    def stop(self, page: str) -> Optional[Path]:
+        """Stop profiling and write `<profile_dir>/<page>/<timestamp>.<ext>`, rotating old files."""
+        elapsed = time.perf_counter() - self.started
+        if self.mode == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+        page_dir = Path(self.conf.profile_dir) / (page.strip("/").replace("/", "_") or "home")
+        suffix = "pstats" if self.mode == "cprofile" else "folded"
+        path = page_dir / f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 10**9:09d}-{os.getpid()}.{suffix}"
+        try:
+            page_dir.mkdir(parents=True, exist_ok=True)
+            if self.mode == "cprofile":
+                pstats.Stats(self._profiler).dump_stats(path)
+            else:
+                self._profiler.dump(path)
+            _rotate(page_dir, suffix, self.conf.profile_max_files)
+        except OSError as e:
+            logger.warning(f"[FE-PROFILE] Unable to write profile for {page}: {e}")
+            return None
+        logger.info(f"[FE-PROFILE] {page} rerun took {elapsed:.3f}s, profile written to {path}")
+        return path
+
+def _rotate(page_dir: Path, suffix: str, max_files: int):
+    files = sorted(page_dir.glob(f"*.{suffix}"), key=lambda p: p.stat().st_mtime)
+    for old in files[:max(len(files) - max_files, 0)]:
+        old.unlink(missing_ok=True)
+
+def resolve_profile_mode(conf: ProfileConfig, query_flag: Optional[str], roles: Optional[Iterable[str]]) -> Optional[str]:
+    """
+    Return the profiling mode for this rerun, or None.
+    PROFILE_MODE turns profiling on for every rerun; `?profile=1` turns it on
+    for a single session when the logged-in user has an admin role.
+    """
+    if conf.profile_mode in PROFILE_MODES:
+        return conf.profile_mode
+    if query_flag in ("1", "true") and conf.profile_query_mode in PROFILE_MODES:
+        if set(roles or ()) & set(conf.profile_admin_roles):
+            return conf.profile_query_mode
+    return None
+
+def start_run_profiler(conf: ProfileConfig, query_flag: Optional[str], roles: Optional[Iterable[str]]) -> Optional[RunProfiler]:
+    """Start profiling the current rerun when enabled; returns None otherwise."""
+    mode = resolve_profile_mode(conf, query_flag, roles)
+    if mode is None:
+        return None
+    return RunProfiler(conf, mode)
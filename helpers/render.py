@@ -0,0 +1,91 @@
+import time
+
+class StreamRenderer:
+    """
+    Render a streamed markdown response with throttled, incremental updates.
+    Chunks are buffered and flushed at most `fps` times per second (or once
+    `flush_bytes` are pending). Completed blocks — paragraphs and closed code
+    fences — are frozen into their own elements so only the tail re-renders.
+    """
+
+    CURSOR = "▌"
+    FENCES = ("```", "~~~")
+
+    def __init__(self, container, fps: float = 12, flush_bytes: int = 4096):
+        self.container = container
+        self.min_interval = 1.0 / fps if fps > 0 else 0.0
+        self.flush_bytes = flush_bytes
+        self._parts: list[str] = []
+        self._pending: list[str] = []
+        self._pending_bytes = 0
+        self._tail = ""
+        self._last_flush = 0.0
+        self._placeholder = container.empty()
+
+    def write(self, chunk: str):
+        """Buffer a chunk and flush if the frame interval or byte threshold is reached."""
+        if not chunk:
+            return
+        self._parts.append(chunk)
+        self._pending.append(chunk)
+        self._pending_bytes += len(chunk)
+
+        now = time.monotonic()
+        if self._pending_bytes >= self.flush_bytes or now - self._last_flush >= self.min_interval:
+            self._flush(now)
+
+    def close(self) -> str:
+        """Render the remaining text without the cursor and return the full response."""
+        self._drain()
+        if self._tail:
+            self._placeholder.markdown(self._tail)
+        else:
+            self._placeholder.empty()
+        return "".join(self._parts)
+
+    def _drain(self):
+        if self._pending:
+            self._tail += "".join(self._pending)
+            self._pending.clear()
+            self._pending_bytes = 0
+
+    def _flush(self, now: float):
+        self._drain()
+        self._last_flush = now
+
+        boundary = self.frozen_boundary(self._tail)
+        if boundary:
+            # Finalize the current element and start a new one for the tail.
+            self._placeholder.markdown(self._tail[:boundary])
+            self._tail = self._tail[boundary:]
+            self._placeholder = self.container.empty()
+
+        self._placeholder.markdown(self._tail + self.CURSOR)
+
+    @classmethod
+    def frozen_boundary(cls, text: str) -> int:
+        """Return the offset up to which `text` consists of complete markdown blocks."""
+        boundary = 0
+        offset = 0
+        in_fence = False
+        has_content = False
+
+        for line in text.splitlines(keepends=True):
+            if not line.endswith("\n"):
+                break
+            offset += len(line)
+            stripped = line.strip()
+
+            if stripped.startswith(cls.FENCES):
+                in_fence = not in_fence
+                has_content = True
+                if not in_fence:
+                    boundary = offset
+            elif in_fence:
+                continue
+            elif stripped:
+                has_content = True
+            elif has_content:
+                boundary = offset
+
+        return boundary
@@ -0,0 +1,100 @@
+import streamlit as st
+from typing import TYPE_CHECKING
+from helpers.config import AppConfig, AWSConfig, ChatConfig, ProfileConfig
+from helpers.claims import ClaimsCache
+
+# Heavy modules (boto3, requests adapters, Pillow, bcrypt via stauth) are
+# imported by the getters that need them, so pages that never touch them
+# don't pay for the import on a cold start.
+if TYPE_CHECKING:
+    import streamlit_authenticator as stauth
+    from helpers.credentials import CredentialStore
+    from helpers.feedback import FeedbackDispatcher
+    from helpers.secret import AWSSecretManager
+    from helpers.http import MakeRequest
+    from helpers.utils import Utils
+
+# ------------- Process-wide resources -------------
+# Built once per process and shared by every session and rerun.
+
+@st.cache_resource(show_spinner=False)
+def get_app_config() -> AppConfig:
+    return AppConfig()
+
+@st.cache_resource(show_spinner=False)
+def get_aws_config() -> AWSConfig:
+    return AWSConfig()
+
+@st.cache_resource(show_spinner=False)
+def get_chat_config() -> ChatConfig:
+    return ChatConfig()
+
+@st.cache_resource(show_spinner=False)
+def get_profile_config() -> ProfileConfig:
+    return ProfileConfig()
+
+@st.cache_resource(show_spinner=False)
+def get_secret_manager() -> "AWSSecretManager":
+    from helpers.secret import AWSSecretManager
+    return AWSSecretManager(get_app_config(), get_aws_config())
+
+@st.cache_resource(show_spinner=False)
+def get_make_request() -> "MakeRequest":
+    from helpers.http import MakeRequest
+    return MakeRequest(get_app_config(), get_aws_config(), get_chat_config(), aws_secret_manager=get_secret_manager())
+
+@st.cache_resource(show_spinner=False)
+def get_utils() -> "Utils":
+    from helpers.utils import Utils
+    return Utils()
+
+@st.cache_resource(show_spinner=False)
+def get_credential_store() -> "CredentialStore":
+    from helpers.credentials import CredentialStore
+    app_conf = get_app_config()
+    return CredentialStore(app_conf.auth_config_path, app_conf.auth_hashed_config_path or None)
+
+@st.cache_resource(show_spinner=False)
+def get_claims_cache() -> ClaimsCache:
+    app_conf = get_app_config()
+    return ClaimsCache(app_conf.auth_claims_cache_size, app_conf.auth_claims_max_ttl_seconds)
+
+@st.cache_resource(show_spinner=False)
+def get_feedback_dispatcher() -> "FeedbackDispatcher":
+    from helpers.feedback import FeedbackDispatcher
+    chat_conf = get_chat_config()
+    return FeedbackDispatcher(
+        send_batch=get_make_request().send_feedback,
+        spill_path=chat_conf.feedback_spill_path,
+        max_queue=chat_conf.feedback_queue_size,
+        batch_size=chat_conf.feedback_batch_size,
+        batch_interval_seconds=chat_conf.feedback_batch_interval_seconds,
+        max_retries=chat_conf.feedback_max_retries,
+        backoff_seconds=chat_conf.feedback_backoff_seconds,
+        backoff_max_seconds=chat_conf.feedback_backoff_max_seconds,
+    )
+
+def get_authenticator(config: dict) -> "stauth.Authenticate":
+    """
+    Build the login authenticator.
+    stauth.Authenticate renders its cookie component and reads cookies while
+    it is constructed, so it is created per run rather than shared; the
+    expensive part (credential hashing) is done once by CredentialStore.
+    """
+    import streamlit_authenticator as stauth
+    return stauth.Authenticate(
+        config['credentials'],
+        config['cookie']['name'],
+        config['cookie']['key'],
+        config['cookie']['expiry_days'],
+        auto_hash=False,
+    )
+
+def clear_resources():
+    """Invalidate every shared resource so the next access rebuilds it."""
+    from helpers.secret import get_secret_cache
+    from helpers.http import close_http_session
+    get_secret_cache(get_aws_config()).invalidate()
+    close_http_session()
+    for resource in (get_app_config, get_aws_config, get_chat_config, get_secret_manager, get_make_request, get_utils, get_credential_store, get_claims_cache, get_profile_config):
+        resource.clear()
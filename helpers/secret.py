@@ -1,34 +1,143 @@
-import boto3
-from botocore.exceptions import ClientError
+import ast
+import json
+import time
+import threading
+from typing import Callable, Dict, Optional
 from helpers.config import AppConfig, AWSConfig
 from helpers.loog import logger
 
+class SecretCache:
+    """Process-wide cache of parsed secrets with background TTL refresh."""
+
+    def __init__(self, ttl_seconds: int, retry_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._values: Dict[str, dict] = {}
+        self._refresh_at: Dict[str, float] = {}
+        self._refreshing: set = set()
+        self._stats = {"hits": 0, "misses": 0, "refreshes": 0, "refresh_failures": 0}
+
+    def get(self, secret_id: str, loader: Callable[[], dict]) -> dict:
+        """
+        Return the parsed secret, loading it on first use.
+        A stale value is served while a background thread refreshes it.
+        """
+        if self.ttl_seconds <= 0:
+            return loader()
+
+        with self._lock:
+            value = self._values.get(secret_id)
+            if value is not None:
+                self._stats["hits"] += 1
+                if time.monotonic() >= self._refresh_at[secret_id] and secret_id not in self._refreshing:
+                    self._refreshing.add(secret_id)
+                    threading.Thread(
+                        target=self._refresh,
+                        args=(secret_id, loader),
+                        name=f"secret-refresh-{secret_id}",
+                        daemon=True,
+                    ).start()
+                return value
+            self._stats["misses"] += 1
+
+        # First fetch is synchronous; concurrent callers wait for a single load.
+        with self._fetch_lock:
+            with self._lock:
+                value = self._values.get(secret_id)
+            if value is not None:
+                return value
+            value = loader()
+            self._store(secret_id, value)
+            return value
+
+    def invalidate(self, secret_id: Optional[str] = None):
+        """Drop one cached secret, or all of them."""
+        with self._lock:
+            if secret_id is None:
+                self._values.clear()
+                self._refresh_at.clear()
+            else:
+                self._values.pop(secret_id, None)
+                self._refresh_at.pop(secret_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return a snapshot of the hit/miss/refresh counters."""
+        with self._lock:
+            return dict(self._stats, cached=len(self._values))
+
+    def _store(self, secret_id: str, value: dict):
+        with self._lock:
+            self._values[secret_id] = value
+            self._refresh_at[secret_id] = time.monotonic() + self.ttl_seconds
+
+    def _refresh(self, secret_id: str, loader: Callable[[], dict]):
+        try:
+            value = loader()
+            self._store(secret_id, value)
+            with self._lock:
+                self._stats["refreshes"] += 1
+        except Exception as e:
+            # Keep serving the last good value and retry later.
+            logger.warning(f"[FE-AWS] Secret refresh failed, using cached value: {e}")
+            with self._lock:
+                self._stats["refresh_failures"] += 1
+                self._refresh_at[secret_id] = time.monotonic() + self.retry_seconds
+        finally:
+            with self._lock:
+                self._refreshing.discard(secret_id)
+
+_secret_cache: Optional[SecretCache] = None
+_secret_cache_lock = threading.Lock()
+
+def get_secret_cache(aws_conf: AWSConfig) -> SecretCache:
+    """Return the process-wide secret cache, creating it on first use."""
+    global _secret_cache
+    if _secret_cache is None:
+        with _secret_cache_lock:
+            if _secret_cache is None:
+                _secret_cache = SecretCache(
+                    ttl_seconds=aws_conf.aws_secret_ttl_seconds,
+                    retry_seconds=aws_conf.aws_secret_retry_seconds,
+                )
+    return _secret_cache
+
 class AWSSecretManager:
     def __init__(self, app_conf: AppConfig, aws_conf: AWSConfig):
         self.app_conf = app_conf
         self.aws_conf = aws_conf
         self._client = None
+        self.cache = get_secret_cache(aws_conf)
 
     @property
     def client(self):
         if self._client is None:
+            # boto3 takes a noticeable share of cold start; load it on first use.
+            import boto3
             session = boto3.session.Session()
             self._client = session.client(
                 service_name='secretsmanager',
                 region_name=self.aws_conf.aws_region
             )
         return self._client
-    
-    def get_secret(self, secret_key: str) -> str:
+
+    def _load_secret(self) -> dict:
+        """Fetch and parse the whole secret string from Secrets Manager."""
+        get_secret_value_response = self.client.get_secret_value(
+            SecretId=self.aws_conf.aws_secret_name
+        )
+        secret_value = get_secret_value_response['SecretString']
         try:
-            
-            get_secret_value_response = self.client.get_secret_value(
-                SecretId=self.aws_conf.aws_secret_name
-            )
-            secret_value = get_secret_value_response['SecretString']
-            secret = eval(secret_value).get(secret_key, "")
+            return json.loads(secret_value)
+        except json.JSONDecodeError:
+            return ast.literal_eval(secret_value)
 
-            return secret
+    def get_secret(self, secret_key: str) -> str:
+        from botocore.exceptions import ClientError
+        try:
+            secret = self.cache.get(self.aws_conf.aws_secret_name, self._load_secret)
+            return secret.get(secret_key, "")
         except ClientError as e:
             logger.error(f"[FE-AWS] Error retrieving secret {secret_key}: {e}")
             return None
@@ -0,0 +1,112 @@
+import os
+import sys
+import time
+import threading
+from typing import Dict, List, Optional
+
+# Installed before helpers.config is imported, so the switch is read straight
+# from the environment.
+STARTUP_PROFILE_ENV = "STARTUP_PROFILE"
+STARTUP_PROFILE_TOP_ENV = "STARTUP_PROFILE_TOP"
+
+# Taken when app.py first imports this module, i.e. after Streamlit itself has loaded.
+_APP_STARTED = time.perf_counter()
+
+class ImportTimer:
+    """
+    Meta path finder that times module execution.
+    It asks the remaining finders for the spec and wraps the loader's
+    exec_module, recording cumulative and self time per module.
+    """
+
+    def __init__(self):
+        self.cumulative: Dict[str, float] = {}
+        self.self_time: Dict[str, float] = {}
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        loader = spec.loader
+        # Class-level loaders (builtin, frozen) are shared; only wrap per-module instances.
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            loader.exec_module = self._timed(fullname, loader.exec_module)
+        return spec
+
+    def _timed(self, fullname, exec_module):
+        def timed_exec_module(module):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                return exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.cumulative[fullname] = elapsed
+                self.self_time[fullname] = elapsed - children
+        return timed_exec_module
+
+    def report(self, limit: int = 25) -> Dict[str, List[dict]]:
+        """Slowest top-level packages (summed self time) and modules (cumulative time)."""
+        packages: Dict[str, float] = {}
+        for name, seconds in self.self_time.items():
+            top = name.split(".")[0]
+            packages[top] = packages.get(top, 0.0) + seconds
+        return {
+            "packages": [
+                {"package": name, "seconds": round(seconds, 4)}
+                for name, seconds in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:limit]
+            ],
+            "modules": [
+                {"module": name, "cumulative_seconds": round(self.cumulative[name], 4), "self_seconds": round(self.self_time[name], 4)}
+                for name in sorted(self.cumulative, key=self.cumulative.get, reverse=True)[:limit]
+            ],
+        }
+
+_import_timer: Optional[ImportTimer] = None
+_reported = False
+_lock = threading.Lock()
+
+def install_from_env():
+    """Start timing imports when STARTUP_PROFILE is set; safe to call on every rerun."""
+    global _import_timer
+    if os.getenv(STARTUP_PROFILE_ENV, "false").lower() != "true":
+        return
+    with _lock:
+        if _import_timer is None:
+            _import_timer = ImportTimer()
+            sys.meta_path.insert(0, _import_timer)
+
+def report_first_render():
+    """Log time to first render and the import breakdown once per process."""
+    global _reported
+    with _lock:
+        if _import_timer is None or _reported:
+            return
+        _reported = True
+        sys.meta_path.remove(_import_timer)
+
+    from helpers.loog import logger
+    limit = int(os.getenv(STARTUP_PROFILE_TOP_ENV, "25"))
+    logger.info({
+        "message": "[FE-STARTUP] First render complete",
+        "first_render_seconds": round(time.perf_counter() - _APP_STARTED, 4),
+        "imports_seconds": round(sum(_import_timer.self_time.values()), 4),
+        **_import_timer.report(limit),
+    })
@@ -0,0 +1,102 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from helpers.loog import logger
+
+@dataclass
+class ConversationSummary:
+    """Rolling summary of the first `covered` history messages."""
+    covered: int
+    text: str
+
+class ConversationSummarizer:
+    """
+    Compact older turns of long sessions into a rolling summary.
+    Summaries are produced by a background call to the chat service and cached
+    per chat_session_id; until one is ready the raw turns are sent unchanged.
+    """
+
+    PROMPT = (
+        "Summarize the conversation below so it can replace the original messages as context. "
+        "Keep facts, decisions, names, numbers and open questions. Reply with the summary only."
+    )
+
+    def __init__(self, complete: Callable[[str, list], str], after_messages: int, keep_messages: int, max_sessions: int = 1000):
+        self.complete = complete
+        self.after_messages = after_messages
+        self.keep_messages = keep_messages
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._summaries: "OrderedDict[str, ConversationSummary]" = OrderedDict()
+        self._inflight: set = set()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="summary")
+
+    @property
+    def enabled(self) -> bool:
+        return self.after_messages > 0
+
+    def get(self, chat_session_id: str) -> Optional[ConversationSummary]:
+        with self._lock:
+            summary = self._summaries.get(chat_session_id)
+            if summary is not None:
+                self._summaries.move_to_end(chat_session_id)
+            return summary
+
+    def apply(self, chat_session_id: str, chat_model: str, messages: list) -> list:
+        """
+        Replace already-summarized history with the cached summary, and schedule
+        a background refresh once enough new turns have aged out of the window.
+        """
+        if not self.enabled or len(messages) <= self.after_messages:
+            return messages
+
+        summary = self.get(chat_session_id)
+        if summary is not None and summary.covered > len(messages):
+            summary = None
+
+        cut = len(messages) - self.keep_messages
+        covered = summary.covered if summary else 0
+        if cut - covered >= self.keep_messages or (summary is None and cut > 0):
+            self._schedule(chat_session_id, chat_model, summary, messages[covered:cut], cut)
+
+        if summary is None:
+            return messages
+
+        return [{"role": "system", "content": f"Summary of the earlier conversation:\n{summary.text}"}] + messages[summary.covered:]
+
+    def _schedule(self, chat_session_id: str, chat_model: str, previous: Optional[ConversationSummary], messages: list, cut: int):
+        with self._lock:
+            if chat_session_id in self._inflight:
+                return
+            self._inflight.add(chat_session_id)
+        self._executor.submit(self._summarize, chat_session_id, chat_model, previous, messages, cut)
+
+    def _summarize(self, chat_session_id: str, chat_model: str, previous: Optional[ConversationSummary], messages: list, cut: int):
+        try:
+            transcript = "\n\n".join(f"{m['role'].capitalize()}: {self._text(m['content'])}" for m in messages)
+            if previous is not None:
+                transcript = f"Earlier summary:\n{previous.text}\n\n{transcript}"
+
+            text = self.complete(chat_model, [{"role": "user", "content": f"{self.PROMPT}\n\n{transcript}"}])
+            if not text:
+                return
+
+            with self._lock:
+                self._summaries[chat_session_id] = ConversationSummary(covered=cut, text=text.strip())
+                self._summaries.move_to_end(chat_session_id)
+                while len(self._summaries) > self.max_sessions:
+                    self._summaries.popitem(last=False)
+            logger.info(f"[FE-SUMMARY] Summarized {cut} messages for session {chat_session_id}")
+        except Exception as e:
+            logger.warning(f"[FE-SUMMARY] Summarization failed for session {chat_session_id}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.discard(chat_session_id)
+
+    @staticmethod
+    def _text(content) -> str:
+        if isinstance(content, str):
+            return content
+        return " ".join(part["text"] for part in content if "text" in part)
@@ -0,0 +1,108 @@
+import json
+import uuid
+import base64
+from typing import Iterator
+
+# Streamed request bodies for the chat service.
+# Large strings (base64 attachments) are written in slices straight from the
+# payload, so the full JSON document never exists in memory at once.
+
+def _coalesce(pieces: Iterator[bytes], chunk_size: int) -> Iterator[bytes]:
+    """Merge small pieces so each HTTP chunk is roughly `chunk_size` bytes."""
+    buffer = []
+    buffered = 0
+    for piece in pieces:
+        buffer.append(piece)
+        buffered += len(piece)
+        if buffered >= chunk_size:
+            yield b"".join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield b"".join(buffer)
+
+def _json_pieces(value, chunk_size: int) -> Iterator[bytes]:
+    if isinstance(value, dict):
+        yield b"{"
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                yield b","
+            yield json.dumps(str(key), ensure_ascii=False).encode("utf-8") + b":"
+            yield from _json_pieces(item, chunk_size)
+        yield b"}"
+    elif isinstance(value, (list, tuple)):
+        yield b"["
+        for i, item in enumerate(value):
+            if i:
+                yield b","
+            yield from _json_pieces(item, chunk_size)
+        yield b"]"
+    elif isinstance(value, str) and len(value) > chunk_size:
+        yield b'"'
+        for start in range(0, len(value), chunk_size):
+            # Escaping is per character, so slices can be escaped independently.
+            yield json.dumps(value[start:start + chunk_size], ensure_ascii=False)[1:-1].encode("utf-8")
+        yield b'"'
+    else:
+        yield json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+def iter_json_body(payload: dict, chunk_size: int) -> Iterator[bytes]:
+    """Serialize `payload` as a chunked JSON request body."""
+    chunk_size = max(1, chunk_size)
+    return _coalesce(_json_pieces(payload, chunk_size), chunk_size)
+
+class MultipartBody:
+    """
+    multipart/form-data body: a "payload" JSON part plus one binary part per
+    attachment. Base64 data in the payload is replaced by {"part": "<name>"}
+    and decoded slice by slice while the body is sent.
+    """
+
+    def __init__(self, payload: dict, chunk_size: int):
+        self.chunk_size = max(4, chunk_size - chunk_size % 4)  # whole base64 quanta, never zero
+        self.boundary = uuid.uuid4().hex
+        self.files = []
+        self.payload = self._extract_files(payload)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __iter__(self) -> Iterator[bytes]:
+        return _coalesce(self._pieces(), self.chunk_size)
+
+    def _extract_files(self, value):
+        """Copy the payload structure, moving base64 strings into file parts."""
+        if isinstance(value, dict):
+            if isinstance(value.get("data"), str) and "media_type" in value:
+                name = self._add_file(value["data"], value["media_type"])
+                return {**{k: v for k, v in value.items() if k != "data"}, "part": name}
+            if isinstance(value.get("bytes"), str) and len(value) == 1:
+                return {"part": self._add_file(value["bytes"], "application/octet-stream")}
+            return {key: self._extract_files(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._extract_files(item) for item in value]
+        return value
+
+    def _add_file(self, data: str, media_type: str) -> str:
+        name = f"file-{len(self.files)}"
+        self.files.append((name, media_type, data))
+        return name
+
+    def _part_header(self, name: str, content_type: str) -> bytes:
+        return (
+            f"--{self.boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"{name}\"; filename=\"{name}\"\r\n"
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+
+    def _pieces(self) -> Iterator[bytes]:
+        yield self._part_header("payload", "application/json")
+        yield json.dumps(self.payload, ensure_ascii=False).encode("utf-8")
+        yield b"\r\n"
+        for name, media_type, data in self.files:
+            yield self._part_header(name, media_type)
+            for start in range(0, len(data), self.chunk_size):
+                yield base64.b64decode(data[start:start + self.chunk_size])
+            yield b"\r\n"
+        yield f"--{self.boundary}--\r\n".encode("utf-8")
@@ -1,10 +1,18 @@
+import io
 import re
+import time
 import base64
+import hashlib
 from enum import Enum
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 from helpers.loog import logger
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from helpers.config import FileConfig
+from helpers.images import ImagePreprocessor
+from helpers.attachments import AttachmentStore, hash_file
+from helpers.extract import DocumentExtractor
+from helpers.metrics import ATTACHMENT_PROCESS_SECONDS
 
 class FileProcessStatus(Enum):
     PENDING = "pending"
@@ -22,6 +30,19 @@ class FileMetadata:
     content: Optional[str] = None
     status: FileProcessStatus = FileProcessStatus.PENDING
     error: Optional[str] = None
+    thumbnail: Optional[bytes] = None
+    sha256: Optional[str] = None  # of the upload; keys the local processing cache
+    content_sha256: Optional[str] = None  # of the bytes sent; keys backend references
+    reference: bool = False  # send as a content-hash reference instead of inline data
+
+    @property
+    def preview(self) -> Optional[bytes]:
+        """Return image bytes for display: the thumbnail, or the decoded upload."""
+        if self.thumbnail:
+            return self.thumbnail
+        if self.base64:
+            return base64.b64decode(self.base64)
+        return self.bytes or None
 
     @property
     def size_kb(self) -> float:
@@ -53,56 +74,108 @@ class FileMetadata:
 class Utils:
     def __init__(self):
         self.file_conf = FileConfig()
+        self._executor = ThreadPoolExecutor(max_workers=self.file_conf.max_workers, thread_name_prefix="file-process")
+        self.image_preprocessor = ImagePreprocessor(
+            max_dimension=self.file_conf.image_max_dimension,
+            max_pixels=self.file_conf.image_max_pixels,
+            quality=self.file_conf.image_quality,
+            cache_size=self.file_conf.image_cache_size,
+            enabled=self.file_conf.image_preprocess,
+        )
+        self.attachment_store = AttachmentStore(max_bytes=self.file_conf.attachment_cache_mb * 1024 * 1024)
+        self.document_extractor = DocumentExtractor(
+            enabled=self.file_conf.extract_documents,
+            max_workers=self.file_conf.extract_workers,
+            max_chars=self.file_conf.extract_max_chars,
+            timeout_seconds=self.file_conf.extract_timeout_seconds,
+        )
     
     def process_multiple_files(self, files) -> list[FileMetadata]:
-        """Process multiple uploaded files and return their metadata."""
-        processed_files = []
-        for file in files:
-            processed_file = self.process_single_file(file)
-            processed_files.append(processed_file)
-        return processed_files
+        """Process multiple uploaded files off the script thread and return their metadata in order."""
+        return list(self._executor.map(self._timed_process_single_file, files))
+
+    def _timed_process_single_file(self, file) -> FileMetadata:
+        started = time.perf_counter()
+        attachment = self.process_single_file(file)
+        if attachment.status != FileProcessStatus.COMPLETED:
+            kind = "failed"
+        elif attachment.is_image:
+            kind = "image"
+        elif attachment.is_document:
+            kind = "document"
+        else:
+            kind = "text"
+        ATTACHMENT_PROCESS_SECONDS.observe(time.perf_counter() - started, kind=kind)
+        return attachment
     
     def process_single_file(self, file) -> FileMetadata:
-        """Process a single uploaded file and return its metadata."""
+        """
+        Process a single uploaded file and return its metadata.
+        The size is checked before reading, binary files are base64-encoded in
+        chunks, and the raw bytes are not kept once encoded.
+        """
         try:
-            file_content = file.read()
-            if len(file_content) > self.file_conf.max_upload_size_mb * 1024 * 1024:
+            file_size = self.get_file_size(file)
+            if file_size > self.file_conf.max_upload_size_mb * 1024 * 1024:
                 return FileMetadata(
                     name=file.name,
                     type=file.type,
-                    size=len(file_content),
+                    size=file_size,
                     bytes=b'',
                     base64=None,
                     status=FileProcessStatus.FAILED,
                     error="File size exceeds the maximum limit."
                 )
             
-            attachment = FileMetadata(
-                name=file.name,
-                type=file.type,
-                size=len(file_content),
-                bytes=file_content,
-                status=FileProcessStatus.PROCESSING,
-                error=None
-            )
-            
+            # Validate before the cache lookup so a hit can never bypass the allow-list.
             if self.is_allow_image_file(file):
-                attachment.base64 = base64.b64encode(file_content).decode('utf-8')
+                kind = "image"
             elif self.is_allow_document_file(file):
-                attachment.base64 = base64.b64encode(file_content).decode('utf-8')
+                kind = "document"
             elif self.is_allow_text_file(file):
-                attachment.content = file_content.decode('utf-8')
+                kind = "text"
             else:
                 return FileMetadata(
                     name=file.name,
                     type=file.type,
-                    size=len(file_content),
+                    size=file_size,
                     bytes=b'',
                     status=FileProcessStatus.FAILED,
                     error="Unsupported file type."
                 )
+
+            sha256 = hash_file(file)
+            cached = self.attachment_store.get(sha256, file.type)
+            if cached is not None:
+                return replace(cached, name=file.name)
+
+            attachment = FileMetadata(
+                name=file.name,
+                type=file.type,
+                size=file_size,
+                bytes=b'',
+                status=FileProcessStatus.PROCESSING,
+                error=None,
+                sha256=sha256,
+            )
+            
+            if kind == "image":
+                file_content, attachment.type = self.image_preprocessor.process(file.read(), file.type)
+                attachment.size = len(file_content)
+                attachment.content_sha256 = hashlib.sha256(file_content).hexdigest()
+                attachment.base64 = base64.b64encode(file_content).decode('utf-8')
+                attachment.thumbnail = self.image_preprocessor.thumbnail(file_content, self.file_conf.thumbnail_size)
+            elif kind == "document":
+                if self.document_extractor.supports(file.name):
+                    attachment.content = self.extract_document(file)
+                if not attachment.content:
+                    attachment.base64 = self.encode_base64(file)
+                    attachment.content_sha256 = sha256
+            else:
+                attachment.content = file.read().decode('utf-8')
             
             attachment.status = FileProcessStatus.COMPLETED
+            self.attachment_store.put(attachment, file.type)
             
             return attachment
         
@@ -112,12 +185,42 @@ class Utils:
                 name=file.name,
                 type=file.type,
                 size=0,
-                content=b'',
+                bytes=b'',
                 base64=None,
                 status=FileProcessStatus.FAILED,
                 error=str(e)
             )
-        
+
+    def extract_document(self, file) -> Optional[str]:
+        """Return the document's text, or None to fall back to sending the binary."""
+        try:
+            return self.document_extractor.extract(file.read(), file.name)
+        except Exception as e:
+            logger.warning(f"[FE-FILE_PROCESSING] Text extraction failed for {file.name} : {e}")
+            return None
+        finally:
+            file.seek(0)
+
+    def get_file_size(self, file) -> int:
+        """Return the upload size without reading its content."""
+        size = getattr(file, "size", None)
+        if size is None:
+            size = file.seek(0, io.SEEK_END)
+            file.seek(0)
+        return size
+
+    def encode_base64(self, file) -> str:
+        """
+        Base64-encode a file in chunks instead of reading it whole first.
+        Chunks are decoded to str as they are produced, so peak memory stays at
+        about twice the encoded size, the same as a one-shot encode.
+        """
+        chunk_size = max(3, self.file_conf.read_chunk_size - self.file_conf.read_chunk_size % 3)  # keep chunks 3-byte aligned
+        parts = []
+        while chunk := file.read(chunk_size):
+            parts.append(base64.b64encode(chunk).decode('ascii'))
+        return "".join(parts)
+
     def is_allow_image_file(self, file) -> bool:
         return (file.type in ["image/png", "image/jpg", "image/jpeg"] and file.name.split('.')[-1].lower() in self.file_conf.allowed_file_types)
     
@@ -0,0 +1,134 @@
+import sys
+import time
+import threading
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from helpers.config import AppConfig, AWSConfig, ChatConfig, MetricsConfig, WarmupConfig
+from helpers.loog import logger
+from helpers.metrics import set_readiness_check, start_metrics_exporter
+
+class Warmup:
+    """
+    Once-per-process warm-up run on a background thread.
+    Fills the process-wide secret cache, opens pooled connections to the chat
+    service and probes its health, and pre-imports modules deferred at
+    startup. Failed runs are retried until they succeed.
+    """
+
+    def __init__(self, conf: WarmupConfig, app_conf: AppConfig, aws_conf: AWSConfig, chat_conf: ChatConfig):
+        self.conf = conf
+        self.app_conf = app_conf
+        self.aws_conf = aws_conf
+        self.chat_conf = chat_conf
+        self._lock = threading.Lock()
+        self._status = "pending"
+        self._attempts = 0
+        self._steps: Dict[str, dict] = {}
+
+    def readiness(self) -> Tuple[bool, dict]:
+        with self._lock:
+            return self._status == "ready", {"status": self._status, "attempts": self._attempts, "steps": dict(self._steps)}
+
+    def start(self):
+        threading.Thread(target=self._run, name="warmup", daemon=True).start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                self._attempts += 1
+            started = time.perf_counter()
+            ok = all([self._step("imports", self._import_modules), self._step("secrets", self._fetch_secrets), self._step("backend", self._open_connections)])
+            with self._lock:
+                self._status = "ready" if ok else "failed"
+            if ok:
+                logger.info(f"[FE-WARMUP] Ready after {time.perf_counter() - started:.2f}s")
+                return
+            logger.warning(f"[FE-WARMUP] Warm-up failed, retrying in {self.conf.warmup_retry_seconds}s: {self._steps}")
+            time.sleep(self.conf.warmup_retry_seconds)
+
+    def _step(self, name: str, func) -> bool:
+        started = time.perf_counter()
+        try:
+            func()
+            result = {"ok": True}
+        except Exception as e:
+            result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        result["seconds"] = round(time.perf_counter() - started, 4)
+        with self._lock:
+            self._steps[name] = result
+        return result["ok"]
+
+    def _import_modules(self):
+        for module in self.conf.warmup_imports:
+            try:
+                importlib.import_module(module)
+            except ImportError as e:
+                # Optional modules are not a reason to hold traffic.
+                logger.debug(f"[FE-WARMUP] Skipping import of {module}: {e}")
+
+    def _fetch_secrets(self):
+        from helpers.secret import AWSSecretManager
+        # Values land in the process-wide secret cache shared with the app's manager.
+        secret_manager = AWSSecretManager(self.app_conf, self.aws_conf)
+        for key in (self.app_conf.jwt_key_name, self.chat_conf.chat_auth_key_name):
+            if not secret_manager.get_secret(key):
+                raise LookupError(f"secret {key} is empty or unavailable")
+
+    def _open_connections(self):
+        from helpers.http import get_http_session
+        session = get_http_session(self.chat_conf)
+        url = f"{self.chat_conf.chat_service_api}{self.conf.warmup_health_endpoint}"
+        timeout = (self.chat_conf.chat_connect_timeout_seconds, self.conf.warmup_timeout_seconds)
+
+        def probe(_):
+            response = session.get(url, timeout=timeout)
+            response.raise_for_status()
+            return response.status_code
+
+        # Concurrent probes each check out their own connection, leaving that many warm in the pool.
+        connections = max(1, min(self.conf.warmup_connections, self.chat_conf.chat_pool_maxsize))
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="warmup-probe") as executor:
+            list(executor.map(probe, range(connections)))
+
+_warmup: Optional[Warmup] = None
+_warmup_lock = threading.Lock()
+
+def start_warmup(conf: Optional[WarmupConfig] = None) -> Optional[Warmup]:
+    """Start warm-up once per process when WARMUP_ENABLED is set and register it as the /ready check."""
+    global _warmup
+    conf = conf or WarmupConfig()
+    if not conf.warmup_enabled:
+        return None
+    with _warmup_lock:
+        if _warmup is None:
+            _warmup = Warmup(conf, AppConfig(), AWSConfig(), ChatConfig())
+            set_readiness_check(_warmup.readiness)
+            _warmup.start()
+    return _warmup
+
+def main():
+    """
+    Warm up, then hand over to the Streamlit CLI in the same process, so the
+    work happens before the first session connects rather than on its first
+    script run:
+
+        python -m helpers.warmup run app.py --server.port 8501
+    """
+    from streamlit.web import cli as stcli
+
+    metrics_conf = MetricsConfig()
+    start_metrics_exporter(
+        port=metrics_conf.metrics_port,
+        host=metrics_conf.metrics_host,
+        path=metrics_conf.metrics_file or None,
+        interval_seconds=metrics_conf.metrics_file_interval_seconds,
+    )
+    start_warmup()
+    sys.argv = ["streamlit", *sys.argv[1:]]
+    sys.exit(stcli.main())
+
+if __name__ == "__main__":
+    # Run from the importable module so app.py sees the same warm-up state.
+    from helpers.warmup import main
+    main()
@@ -1,16 +1,15 @@
-import base64
 import streamlit as st
+from helpers.history import UI_ONLY_KEY
 from helpers.loog import logger
-from helpers.utils import Utils
-from helpers.http import MakeRequest
-from helpers.config import AppConfig, AWSConfig, ChatConfig
+from helpers.render import StreamRenderer
+from helpers.resources import get_chat_config, get_feedback_dispatcher, get_make_request, get_utils
 from langchain_community.chat_message_histories import StreamlitChatMessageHistory
+from langchain_core.messages import AIMessage
 
-app_conf = AppConfig()
-aws_conf = AWSConfig()
-chat_conf = ChatConfig()
-make_request = MakeRequest(app_conf, aws_conf, chat_conf)
-utils = Utils()
+chat_conf = get_chat_config()
+make_request = get_make_request()
+utils = get_utils()
+feedback_dispatcher = get_feedback_dispatcher()
 
 def init_session_state(default_model: str = "claude"):
     """Initialize session state."""
@@ -18,9 +17,13 @@ def init_session_state(default_model: str = "claude"):
         st.session_state.feedback = {}  # {message_index: "up"/"down"}
     if "selected_model" not in st.session_state:
         st.session_state.selected_model = default_model
+    # A new chat session starts again from the latest page of history.
+    if st.session_state.get("history_window_session") != st.session_state.get("chat_session_id"):
+        st.session_state.history_window = chat_conf.history_page_size
+        st.session_state.history_window_session = st.session_state.get("chat_session_id")
 
 def save_feedback(message_index: int):
-    """Save user feedback and send to backend."""
+    """Save user feedback and queue it for the backend."""
     key = f"feedback_{message_index}"
     user_feedback = st.session_state.get(key, None)
 
@@ -29,6 +32,7 @@ def save_feedback(message_index: int):
     st.session_state.feedback[message_index] = user_feedback
 
     # Retrieve message content (safe lookup)
+    message_content = None
     msgs = st.session_state.get("chat_history", None)
     if isinstance(msgs, list):
         if 0 <= message_index < len(msgs):
@@ -41,21 +45,23 @@ def save_feedback(message_index: int):
     logger.info(f"[Feedback] Message {message_index} => {user_feedback}")
     try:
         if message_content:
-            make_request.post(
-                endpoint=chat_conf.chat_feedback_endpoint,
-                data={
-                    "message_index": message_index,
-                    "message_content": message_content,
-                    "feedback": user_feedback,
-                },
-            )
+            feedback_dispatcher.submit({
+                "message_index": message_index,
+                "message_content": message_content,
+                "feedback": user_feedback,
+            })
         else:
             logger.warning(f"[Feedback] No content found for message {message_index}")
     except Exception as e:
         logger.error(f"[Feedback] Failed to send feedback: {e}")
 
+@st.fragment
 def render_model_selector():
-    """Render model selector with session persistence."""
+    """
+    Render model selector with session persistence.
+    Runs as a fragment: changing the model only reruns this widget; the chat
+    fragment reads the choice from session_state when a message is sent.
+    """
 
     col1, col2, col3, col4, col5, col6 = st.columns(6)
 
@@ -78,7 +84,121 @@ def render_model_selector():
             st.session_state.selected_model = selected_model
             st.toast(f"Model selected: {selected_model}", icon="✅")
 
-    return st.session_state.selected_model
+@st.fragment
+def render_feedback(message_index: int):
+    """Thumbs feedback for one assistant message; a click reruns only this fragment."""
+    existing_feedback = st.session_state.feedback.get(message_index)
+    st.session_state[f"feedback_{message_index}"] = existing_feedback
+    st.feedback(
+        "thumbs",
+        key=f"feedback_{message_index}",
+        disabled=existing_feedback is not None,
+        on_change=save_feedback,
+        args=[message_index],
+    )
+
+def render_message(message_index: int, msg):
+    """Render one finalized history message."""
+    if msg.type == "ai":
+        # Feedback for assistant messages only
+        with st.chat_message("assistant"):
+            st.write(msg.content)
+            render_feedback(message_index)
+    else:
+        st.chat_message("user").write(msg.content)
+
+def load_earlier_messages():
+    st.session_state.history_window += chat_conf.history_page_size
+
+@st.fragment
+def render_history():
+    """
+    Windowed chat history.
+    Only the latest HISTORY_PAGE_SIZE messages up to the last full run are
+    drawn; "Load earlier" widens the window and reruns only this fragment.
+    """
+    msgs = StreamlitChatMessageHistory(key="chat_history")
+    end = st.session_state.get("chat_rendered_count", len(msgs.messages))
+    start = 0
+    if chat_conf.history_page_size > 0:
+        start = max(0, end - st.session_state.history_window)
+
+    if start > 0:
+        st.button(
+            f"Load earlier messages ({start} hidden)",
+            key="history_load_earlier",
+            icon="⬆️",
+            on_click=load_earlier_messages,
+        )
+    for idx, msg in enumerate(msgs.messages[start:end], start=start):
+        render_message(idx, msg)
+
+@st.fragment
+def render_chat():
+    """
+    Live chat region.
+    Sending a message reruns only this fragment. The history above it is
+    drawn by the last full run, so this fragment redraws just the turns
+    added since then, followed by the new turn. Once those exceed
+    HISTORY_PAGE_SIZE messages a full rerun folds them into the windowed
+    history, so the cost of a send stays bounded by the page size.
+    That st.rerun(scope="app") gives up fragment isolation once per page of
+    messages: the send that crosses the limit redraws the whole page.
+    Fragment reruns do not pass through main(), so errors are handled here.
+    """
+    try:
+        render_live_chat()
+    except Exception as e:
+        logger.error(f"An error occurred: {e}")
+        st.error("An unexpected error occurred. Please refresh and try again.")
+        st.exception(e)
+
+def render_live_chat():
+    msgs = StreamlitChatMessageHistory(key="chat_history")
+    rendered = st.session_state.get("chat_rendered_count", 0)
+    for idx, msg in enumerate(msgs.messages[rendered:], start=rendered):
+        render_message(idx, msg)
+
+    # Input box
+    if message := st.chat_input("Type your message here...", accept_file="multiple", file_type=["txt", "pdf", "docx", "png", "jpg", "jpeg", "csv", "xlsx"]):
+
+        prompt = message["text"]
+        files = message["files"]
+        attachments = []
+        
+        if not prompt:
+            st.warning("Please enter a message.")
+            st.stop()
+        
+        if files:
+            attachments = utils.process_multiple_files(files)
+        
+        st.chat_message("user").write(prompt)
+
+        if files:
+            for attachment in attachments:
+                if attachment.is_image:
+                    st.image(image=attachment.preview, width=100)
+                    st.write(f"Attachment: {attachment.name} - {attachment.size_kb} KB")
+                else:
+                    st.write(f"Attachment: {attachment.name} - {attachment.size_kb} KB")
+
+        # Stream AI response
+        with st.chat_message("assistant"):
+            renderer = StreamRenderer(st.container(), fps=chat_conf.stream_render_fps, flush_bytes=chat_conf.stream_render_flush_bytes)
+            for chunk in make_request.stream_chat_completions(st.session_state.selected_model, msgs, prompt, attachments):
+                renderer.write(chunk)
+            full_response = renderer.close()
+
+            msgs.add_user_message(prompt)
+            msgs.add_ai_message(full_response)
+            
+            # Feedback for new AI message
+            render_feedback(len(msgs.messages) - 1)
+
+        live_messages = len(msgs.messages) - st.session_state.get("chat_rendered_count", 0)
+        if 0 < chat_conf.history_page_size < live_messages:
+            st.rerun(scope="app")
 
 class AgentPage:
     def __init__(self):
@@ -89,77 +209,19 @@ class AgentPage:
         
         init_session_state(default_model="claude")
 
-        chat_model = render_model_selector()
+        render_model_selector()
 
         msgs = StreamlitChatMessageHistory(key="chat_history")
 
         if not msgs.messages:
-            msgs.add_ai_message("👋 Hello! How can I assist you today?")
+            # Shown only in the UI; delta mode leaves it out of the history sent and hashed.
+            msgs.add_message(AIMessage(content="👋 Hello! How can I assist you today?", additional_kwargs={UI_ONLY_KEY: True}))
 
         # Display chat history
-        for idx, msg in enumerate(msgs.messages):
-            role = "assistant" if msg.type == "ai" else "user"
-
-            if role == "user":
-                st.chat_message("user").write(msg.content)
-            else:
-                # Feedback for assistant messages only
-                with st.chat_message("assistant"):
-                    st.write(msg.content)
-                    existing_feedback = st.session_state.feedback.get(idx)
-                    st.session_state[f"feedback_{idx}"] = existing_feedback
-                    st.feedback(
-                        "thumbs",
-                        key=f"feedback_{idx}",
-                        disabled=existing_feedback is not None,
-                        on_change=save_feedback,
-                        args=[idx],
-                    )
-
-        # Input box
-        if message := st.chat_input("Type your message here...", accept_file="multiple", file_type=["txt", "pdf", "docx", "png", "jpg", "jpeg", "csv", "xlsx"]):
-
-            prompt = message["text"]
-            files = message["files"]
-            attachments = []
-            
-            if not prompt:
-                st.warning("Please enter a message.")
-                st.stop()
-            
-            if files:
-                attachments = utils.process_multiple_files(files)
-            
-            st.chat_message("user").write(prompt)
-
-            if files:
-                for attachment in attachments:
-                    if attachment.is_image:
-                        st.image(image=attachment.bytes, width=100)
-                        st.write(f"Attachment: {attachment.name} - {attachment.size_kb} KB")
-                    else:
-                        st.write(f"Attachment: {attachment.name} - {attachment.size_kb} KB")
-
-            # Stream AI response
-            with st.chat_message("assistant"):
-                placeholder = st.empty()
-                full_response = ""
-                for chunk in make_request.stream_chat_completions(chat_model, msgs, prompt, attachments):
-                    full_response += chunk
-                    placeholder.markdown(full_response + "▌")
-                placeholder.markdown(full_response)
-
-                msgs.add_ai_message(full_response)
-                
-                # Feedback for new AI message
-                idx = len(msgs.messages) - 1
-                st.session_state[f"feedback_{idx}"] = None
-                st.feedback(
-                    "thumbs",
-                    key=f"feedback_{idx}",
-                    on_change=save_feedback,
-                    args=[idx],
-                )
+        st.session_state["chat_rendered_count"] = len(msgs.messages)
+        render_history()
+
+        render_chat()
 
     def run(self):
         self.display()
@@ -1,27 +1,15 @@
 import streamlit as st
 import uuid
 import base64
-import yaml
-from yaml.loader import SafeLoader
-import streamlit_authenticator as stauth
-from helpers.config import AppConfig
+from helpers.resources import get_app_config, get_authenticator, get_credential_store
 from helpers.loog import logger
 
-with open('auth_config.yml') as file:
-    config = yaml.load(file, Loader=SafeLoader)
-
-stauth.Hasher.hash_passwords(config['credentials'])
-authenticator = stauth.Authenticate(
-    config['credentials'],
-    config['cookie']['name'],
-    config['cookie']['key'],
-    config['cookie']['expiry_days']
-)
+authenticator = get_authenticator(get_credential_store().load())
 
 # ------------- Login Page Class -------------
 class LoginPage:
     def __init__(self):
-        self.app_conf = AppConfig()
+        self.app_conf = get_app_config()
 
     def display(self):
         st.logo(self.app_conf.logo_path, size="large", icon_image=self.app_conf.logo_path)
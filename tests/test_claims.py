@@ -0,0 +1,65 @@
+import pytest
+from helpers import claims as claims_module
+from helpers.claims import ClaimsCache, token_digest
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(claims_module.time, "time", lambda: now[0])
+    return now
+
+def test_tokens_are_not_stored_raw(clock):
+    cache = ClaimsCache(max_entries=10, max_ttl_seconds=60)
+    cache.put("raw.jwt.token", {"sub": "user"})
+    assert list(cache._entries) == [token_digest("raw.jwt.token")]
+    assert cache.get("raw.jwt.token") == {"sub": "user"}
+
+def test_entries_expire_at_max_ttl(clock):
+    cache = ClaimsCache(max_entries=10, max_ttl_seconds=60)
+    cache.put("token", {"sub": "user", "exp": clock[0] + 3600})
+    clock[0] += 59
+    assert cache.get("token") == {"sub": "user", "exp": 1_003_600.0}
+    clock[0] += 1
+    assert cache.get("token") is None
+    assert cache.stats() == {"hits": 1, "misses": 0, "expired": 1, "entries": 0}
+
+def test_entries_expire_at_token_exp(clock):
+    cache = ClaimsCache(max_entries=10, max_ttl_seconds=60)
+    cache.put("token", {"sub": "user", "exp": clock[0] + 10})
+    clock[0] += 9
+    assert cache.get("token") is not None
+    clock[0] += 1
+    assert cache.get("token") is None
+
+def test_expired_token_is_never_served(clock):
+    cache = ClaimsCache(max_entries=10, max_ttl_seconds=60)
+    cache.put("token", {"exp": clock[0] - 1})
+    assert cache.get("token") is None
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = ClaimsCache(max_entries=2, max_ttl_seconds=60)
+    cache.put("a", {"sub": "a"})
+    cache.put("b", {"sub": "b"})
+    cache.get("a")
+    cache.put("c", {"sub": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"sub": "a"} and cache.get("c") == {"sub": "c"}
+
+def test_returned_claims_are_copies(clock):
+    cache = ClaimsCache(max_entries=10, max_ttl_seconds=60)
+    cache.put("token", {"roles": "user"})
+    cache.get("token")["roles"] = "admin"
+    assert cache.get("token") == {"roles": "user"}
+
+def test_disabled_cache_and_invalidation(clock):
+    disabled = ClaimsCache(max_entries=0, max_ttl_seconds=60)
+    disabled.put("token", {"sub": "user"})
+    assert disabled.get("token") is None
+
+    cache = ClaimsCache(max_entries=10, max_ttl_seconds=60)
+    cache.put("a", {})
+    cache.put("b", {})
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") == {}
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
@@ -0,0 +1,52 @@
+from dataclasses import replace
+from langchain_core.messages import AIMessage, HumanMessage
+from helpers.config import AppConfig, AWSConfig, ChatConfig
+from helpers.context import ContextWindow, TokenEstimator
+from helpers.history import HistoryDigest
+from helpers.http import MakeRequest
+
+def message(role: str, words: int) -> dict:
+    return {"role": role, "content": "word " * words}
+
+def window(budget: int, keep_last: int = 2, reserve: int = 0) -> ContextWindow:
+    return ContextWindow(budget_tokens=budget, reserve_tokens=reserve, keep_last=keep_last, estimator=TokenEstimator(tokenizer=lambda text: len(text.split())))
+
+def test_zero_budget_disables_trimming():
+    messages = [message("user", 100) for _ in range(5)]
+    assert window(0).fit(messages) is messages
+
+def test_fit_keeps_newest_contiguous_window():
+    messages = [message("user", 10), message("assistant", 10), message("user", 10), message("assistant", 10), message("user", 10)]
+    # 14 tokens per message: room for the two pinned ones and one more.
+    assert window(42).fit(messages) == messages[2:]
+
+def test_fit_stops_at_first_message_that_does_not_fit():
+    messages = [message("user", 1), message("assistant", 50), message("user", 10), message("assistant", 10)]
+    assert window(40).fit(messages) == messages[2:]
+
+def test_fit_keeps_system_and_pinned_messages_over_budget():
+    messages = [message("system", 5), message("user", 10), message("assistant", 100), message("user", 100)]
+    assert window(10).fit(messages) == [messages[0], messages[2], messages[3]]
+
+def test_reserve_is_taken_from_budget():
+    messages = [message("user", 10), message("assistant", 10), message("user", 10)]
+    assert window(42, keep_last=1).fit(messages) == messages
+    assert window(42, keep_last=1, reserve=14).fit(messages) == messages[1:]
+
+def test_resync_payload_is_trimmed_and_hashed_from_the_trim_point():
+    chat_conf = replace(ChatConfig(), chat_context_default_budget=60, chat_context_keep_messages=2, max_response_tokens=0, chat_context_budgets={})
+    make_request = MakeRequest(AppConfig(), AWSConfig(), chat_conf, aws_secret_manager=object())
+    history = [HumanMessage(content="word " * 40), AIMessage(content="word " * 40), HumanMessage(content="hi"), AIMessage(content="hello")]
+    messages = [{"role": "user" if m.type == "human" else "assistant", "content": m.content} for m in history]
+    messages.append({"role": "user", "content": "next"})
+    payload = {"chat_session_id": "resync-test", "model_name": "claude", "messages": messages}
+
+    resync = make_request._resync_payload(payload, "claude", history)
+
+    assert resync["history_mode"] == "full"
+    assert resync["history_offset"] == 2
+    assert resync["messages"] == messages[2:]
+    assert resync["history_version"] == 4
+    assert resync["history_hash"] == HistoryDigest.compute("other", history[2:], state={})[1]
+    # Later deltas chain from the same point.
+    assert HistoryDigest.offset("resync-test") == 2
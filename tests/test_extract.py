@@ -0,0 +1,17 @@
+import pytest
+from helpers.extract import DocumentExtractor, FutureTimeoutError
+
+def test_timeout_recycles_the_pool():
+    extractor = DocumentExtractor(enabled=True, max_workers=1, max_chars=1000, timeout_seconds=0.001)
+    executor = extractor.executor
+    with pytest.raises(FutureTimeoutError):
+        extractor.extract(b"a,b\n1,2\n", "data.csv")
+    processes = list(executor._processes.values()) if executor._processes else []
+    for process in processes:
+        process.join(timeout=5)
+        assert not process.is_alive()
+    assert extractor.executor is not executor
+
+    extractor.timeout_seconds = 60
+    assert "1,2" in extractor.extract(b"a,b\n1,2\n", "data.csv")
+    extractor.executor.shutdown()
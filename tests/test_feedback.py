@@ -0,0 +1,156 @@
+import json
+import time
+import pytest
+import requests
+from dataclasses import replace
+from helpers.config import AppConfig, AWSConfig, ChatConfig
+from helpers.feedback import FeedbackDispatcher, PermanentDeliveryError
+from helpers.http import MakeRequest
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def read_jsonl(path) -> list:
+    return [json.loads(line) for line in path.read_text().splitlines()] if path.exists() else []
+
+def dispatcher(tmp_path, send_batch, **overrides) -> FeedbackDispatcher:
+    options = {"batch_size": 2, "batch_interval_seconds": 0.2, "max_retries": 2, "backoff_seconds": 0.001, "backoff_max_seconds": 0.01}
+    return FeedbackDispatcher(send_batch=send_batch, spill_path=tmp_path / "spill.jsonl", **{**options, **overrides})
+
+def test_events_are_batched(tmp_path):
+    sent = []
+    feedback = dispatcher(tmp_path, lambda batch: sent.append(list(batch)))
+    for i in range(3):
+        feedback.submit({"id": i})
+    wait_for(lambda: sum(map(len, sent)) == 3)
+    assert sent == [[{"id": 0}, {"id": 1}], [{"id": 2}]]
+
+def test_failed_batch_is_retried_then_spilled_and_replayed(tmp_path):
+    calls = []
+    down = True
+
+    def send_batch(batch):
+        calls.append(list(batch))
+        if down:
+            raise requests.exceptions.ConnectionError("down")
+
+    feedback = dispatcher(tmp_path, send_batch)
+    feedback.submit({"id": 0})
+    wait_for(lambda: read_jsonl(feedback.spill_path) == [{"id": 0}])
+    assert calls == [[{"id": 0}]] * 3
+
+    down = False
+    feedback.submit({"id": 1})
+    wait_for(lambda: [{"id": 0}] in calls[3:])
+    assert calls[3:] == [[{"id": 1}], [{"id": 0}]]
+    assert not feedback.spill_path.exists() and not feedback.replay_path.exists()
+
+def test_permanent_rejection_is_not_retried(tmp_path):
+    calls = []
+
+    def send_batch(batch):
+        calls.append(list(batch))
+        raise PermanentDeliveryError("400")
+
+    feedback = dispatcher(tmp_path, send_batch)
+    feedback.submit({"id": 0})
+    wait_for(lambda: read_jsonl(feedback.rejected_path) == [{"id": 0}])
+    assert calls == [[{"id": 0}]]
+    assert not feedback.spill_path.exists()
+
+def test_retry_only_resends_undelivered_events(tmp_path):
+    calls = []
+
+    def send_batch(batch):
+        calls.append(list(batch))
+        if len(calls) == 1:
+            batch.pop(0)
+            raise requests.exceptions.ConnectionError("dropped")
+
+    feedback = dispatcher(tmp_path, send_batch)
+    feedback.submit({"id": 0})
+    feedback.submit({"id": 1})
+    wait_for(lambda: len(calls) == 2)
+    assert calls == [[{"id": 0}, {"id": 1}], [{"id": 1}]]
+
+class FakeResponse:
+    def __init__(self, status_code: int):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code), response=self)
+
+class FakeSession:
+    def __init__(self, statuses: dict):
+        self.statuses = statuses
+        self.posts = []
+
+    def post(self, url, headers, json, timeout):
+        endpoint = url.removeprefix("http://backend/chat/")
+        self.posts.append((endpoint, json))
+        status = self.statuses.get(endpoint, 200)
+        return FakeResponse(status(json) if callable(status) else status)
+
+class FakeCache:
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, secret_id=None):
+        self.invalidated.append(secret_id)
+
+class FakeSecretManager:
+    def __init__(self):
+        self.cache = FakeCache()
+
+    def get_secret(self, key):
+        return "token"
+
+@pytest.fixture
+def make_request(monkeypatch):
+    def build(statuses: dict, **overrides) -> MakeRequest:
+        chat_conf = replace(ChatConfig(), chat_service_api="http://backend/", **overrides)
+        request = MakeRequest(AppConfig(), AWSConfig(), chat_conf, aws_secret_manager=FakeSecretManager())
+        session = FakeSession(statuses)
+        monkeypatch.setattr(MakeRequest, "session", property(lambda self: session))
+        return request
+    return build
+
+def test_events_are_posted_one_by_one_by_default(make_request):
+    request = make_request({})
+    events = [{"id": 0}, {"id": 1}]
+    request.send_feedback(events)
+    assert request.session.posts == [("feedback", {"id": 0}), ("feedback", {"id": 1})]
+    assert events == []
+
+def test_batch_endpoint_when_enabled(make_request):
+    request = make_request({}, chat_feedback_batch=True)
+    request.send_feedback([{"id": 0}, {"id": 1}])
+    assert request.session.posts == [("feedback/batch", {"items": [{"id": 0}, {"id": 1}]})]
+
+@pytest.mark.parametrize("status", [404, 405, 501])
+def test_unsupported_batch_endpoint_falls_back_to_single_events(make_request, status):
+    request = make_request({"feedback/batch": status}, chat_feedback_batch=True)
+    request.send_feedback([{"id": 0}, {"id": 1}])
+    request.send_feedback([{"id": 2}, {"id": 3}])
+    assert [endpoint for endpoint, _ in request.session.posts] == ["feedback/batch"] + ["feedback"] * 4
+
+@pytest.mark.parametrize("status", [401, 403])
+def test_auth_errors_refresh_the_secret_and_are_retryable(make_request, status):
+    request = make_request({"feedback": status})
+    events = [{"id": 0}]
+    with pytest.raises(requests.exceptions.HTTPError):
+        request.send_feedback(events)
+    assert request.aws_secret_manager.cache.invalidated == [request.aws_conf.aws_secret_name]
+    assert events == [{"id": 0}]
+
+def test_only_rejected_events_are_left_for_rejection(make_request):
+    request = make_request({"feedback": lambda event: 400 if event["id"] == 1 else 200})
+    events = [{"id": 0}, {"id": 1}, {"id": 2}]
+    with pytest.raises(PermanentDeliveryError):
+        request.send_feedback(events)
+    assert events == [{"id": 1}]
+    assert len(request.session.posts) == 3
@@ -0,0 +1,46 @@
+import hashlib
+from langchain_core.messages import AIMessage, HumanMessage
+from helpers.history import UI_ONLY_KEY, HistoryDigest, is_ui_only
+
+def chain(*turns):
+    digest = HistoryDigest.EMPTY
+    for role, content in turns:
+        digest = HistoryDigest.extend(digest, role, content)
+    return digest
+
+def test_empty_history():
+    assert HistoryDigest.EMPTY == hashlib.sha256(b"").hexdigest()
+    assert HistoryDigest.compute("s1", [], state={}) == (0, HistoryDigest.EMPTY)
+
+def test_extend_uses_canonical_json():
+    expected = hashlib.sha256((HistoryDigest.EMPTY + '{"content":"héllo","role":"user"}').encode("utf-8")).hexdigest()
+    assert HistoryDigest.extend(HistoryDigest.EMPTY, "user", "héllo") == expected
+
+def test_compute_chains_roles_and_content():
+    messages = [HumanMessage(content="hi"), AIMessage(content="hello")]
+    version, digest = HistoryDigest.compute("s1", messages, state={})
+    assert version == 2
+    assert digest == chain(("user", "hi"), ("assistant", "hello"))
+
+def test_compute_extends_cached_prefix():
+    state = {}
+    messages = [HumanMessage(content="hi"), AIMessage(content="hello")]
+    HistoryDigest.compute("s1", messages, state=state)
+    messages += [HumanMessage(content="again"), AIMessage(content="sure")]
+    version, digest = HistoryDigest.compute("s1", messages, state=state)
+    assert version == 4
+    assert digest == HistoryDigest.compute("s1", messages, state={})[1]
+    assert state[HistoryDigest.SESSION_KEY]["version"] == 4
+
+def test_compute_restarts_for_another_session_or_shorter_history():
+    state = {}
+    messages = [HumanMessage(content="hi"), AIMessage(content="hello")]
+    HistoryDigest.compute("s1", messages, state=state)
+    assert HistoryDigest.compute("s2", messages[:1], state=state) == (1, chain(("user", "hi")))
+    assert HistoryDigest.compute("s2", [], state=state) == (0, HistoryDigest.EMPTY)
+
+def test_ui_only_messages_are_marked():
+    greeting = AIMessage(content="👋 Hello!", additional_kwargs={UI_ONLY_KEY: True})
+    assert is_ui_only(greeting)
+    assert not is_ui_only(AIMessage(content="hello"))
+    assert not is_ui_only(HumanMessage(content="hi"))
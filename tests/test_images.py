@@ -0,0 +1,45 @@
+import io
+import random
+from PIL import Image
+from helpers.images import ImagePreprocessor
+
+def encode(image: Image.Image, format: str, **params) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=format, **params)
+    return output.getvalue()
+
+def noise(size: tuple, mode: str = "RGB") -> Image.Image:
+    rng = random.Random(0)
+    return Image.frombytes(mode, size, bytes(rng.randrange(256) for _ in range(size[0] * size[1] * len(mode))))
+
+def preprocessor(**overrides) -> ImagePreprocessor:
+    return ImagePreprocessor(**{"max_dimension": 1024, "max_pixels": 1024 * 1024, "quality": 85, **overrides})
+
+def test_small_jpeg_is_sent_unchanged():
+    data = encode(noise((64, 64)), "JPEG", quality=30)
+    assert preprocessor().process(data, "image/jpeg") == (data, "image/jpeg")
+
+def test_flat_opaque_png_stays_png():
+    data = encode(Image.new("RGB", (256, 256), "white"), "PNG")
+    result, media_type = preprocessor().process(data, "image/png")
+    assert media_type == "image/png"
+    assert len(result) <= len(data)
+
+def test_noisy_opaque_png_becomes_jpeg_when_smaller():
+    data = encode(noise((256, 256)), "PNG")
+    result, media_type = preprocessor().process(data, "image/png")
+    assert media_type == "image/jpeg"
+    assert len(result) < len(data)
+
+def test_large_image_is_downscaled():
+    data = encode(noise((400, 200)), "PNG")
+    result, media_type = preprocessor(max_dimension=100).process(data, "image/png")
+    with Image.open(io.BytesIO(result)) as image:
+        assert image.size == (100, 50)
+
+def test_transparent_image_stays_png():
+    data = encode(noise((400, 200), "RGBA"), "PNG")
+    result, media_type = preprocessor(max_dimension=100).process(data, "image/png")
+    assert media_type == "image/png"
+    with Image.open(io.BytesIO(result)) as image:
+        assert image.mode == "RGBA"
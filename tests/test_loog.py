@@ -0,0 +1,28 @@
+import os
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+def run_logging(tmp_path, log_async: str) -> tuple:
+    env = {
+        **os.environ,
+        "LOG_DIR": str(tmp_path),
+        "LOG_FILE": "true",
+        "LOG_STDOUT": "true",
+        "LOG_ASYNC": log_async,
+        "LOG_LEVEL": "INFO",
+    }
+    script = "from helpers.loog import logger\nlogger.info('first')\nlogger.info('second')\n"
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    stdout = [json.loads(line)["message"] for line in result.stdout.splitlines()]
+    written = [json.loads(line)["message"] for line in (tmp_path / "app.log").read_text().splitlines()]
+    return stdout, written
+
+def test_first_record_is_emitted_once_per_handler(tmp_path):
+    assert run_logging(tmp_path, "false") == (["first", "second"], ["first", "second"])
+
+def test_first_record_is_emitted_once_per_handler_async(tmp_path):
+    assert run_logging(tmp_path, "true") == (["first", "second"], ["first", "second"])
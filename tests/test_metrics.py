@@ -0,0 +1,48 @@
+from helpers.metrics import Histogram, MetricsRegistry, timer
+
+def test_render_cumulative_buckets_sum_and_count():
+    histogram = Histogram("test_seconds", "Test latency.", buckets=(1.0, 0.1))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, stage="ttft")
+    assert histogram.render() == [
+        "# HELP test_seconds Test latency.",
+        "# TYPE test_seconds histogram",
+        'test_seconds_bucket{stage="ttft",le="0.1"} 1',
+        'test_seconds_bucket{stage="ttft",le="1.0"} 2',
+        'test_seconds_bucket{stage="ttft",le="+Inf"} 3',
+        'test_seconds_sum{stage="ttft"} 5.55',
+        'test_seconds_count{stage="ttft"} 3',
+    ]
+
+def test_render_without_labels():
+    histogram = Histogram("plain", "Plain.", buckets=(1,))
+    histogram.observe(2)
+    assert histogram.render()[2:] == ['plain_bucket{le="1"} 0', 'plain_bucket{le="+Inf"} 1', "plain_sum 2.0", "plain_count 1"]
+
+def test_series_are_keyed_by_sorted_labels():
+    histogram = Histogram("labels", "Labels.", buckets=(1,))
+    histogram.observe(0.5, stage="total", model="claude")
+    histogram.observe(0.5, model="claude", stage="total")
+    histogram.observe(0.5, model="llama", stage="total")
+    lines = histogram.render()
+    assert 'labels_count{model="claude",stage="total"} 2' in lines
+    assert 'labels_count{model="llama",stage="total"} 1' in lines
+    assert histogram.totals(model="claude") == (1.0, 2)
+    assert histogram.totals(stage="total") == (1.5, 3)
+
+def test_label_values_are_escaped():
+    histogram = Histogram("escaped", "Escaped.", buckets=(1,))
+    histogram.observe(0.5, host='a"b\\c\nd')
+    assert 'escaped_count{host="a\\"b\\\\c\\nd"} 1' in histogram.render()
+
+def test_registry_reuses_histograms_and_renders_all():
+    registry = MetricsRegistry()
+    first = registry.histogram("one_seconds", "One.")
+    assert registry.histogram("one_seconds") is first
+    registry.histogram("two_seconds", "Two.")
+    with timer(first, stage="x"):
+        pass
+    rendered = registry.render()
+    assert rendered.endswith("\n")
+    assert "# TYPE one_seconds histogram" in rendered and "# TYPE two_seconds histogram" in rendered
+    assert 'one_seconds_count{stage="x"} 1' in rendered
@@ -0,0 +1,48 @@
+import pytest
+from helpers.render import StreamRenderer
+
+boundary = StreamRenderer.frozen_boundary
+
+@pytest.mark.parametrize("text", ["", "partial line", "one line\n", "two\nlines\n", "\n\n\n"])
+def test_no_boundary_without_a_finished_block(text):
+    assert boundary(text) == 0
+
+def test_blank_line_ends_a_paragraph():
+    text = "first paragraph\nstill first\n\nsecond"
+    assert boundary(text) == len("first paragraph\nstill first\n\n")
+
+def test_last_blank_line_wins():
+    text = "one\n\ntwo\n\nthree\n"
+    assert boundary(text) == len("one\n\ntwo\n\n")
+
+def test_open_fence_is_not_frozen():
+    text = "intro\n\n```python\nx = 1\n\ny = 2\n"
+    assert boundary(text) == len("intro\n\n")
+
+@pytest.mark.parametrize("fence", ["```", "~~~"])
+def test_closed_fence_is_frozen(fence):
+    text = f"{fence}python\nx = 1\n\ny = 2\n{fence}\nafter"
+    assert boundary(text) == len(text) - len("after")
+
+def test_fence_line_without_newline_is_not_counted():
+    assert boundary("```\ncode\n```") == 0
+
+def test_renderer_freezes_blocks_into_new_elements():
+    class Element:
+        def __init__(self, log):
+            self.log = log
+
+        def markdown(self, text):
+            self.log.append((id(self), text))
+
+        def empty(self):
+            return Element(self.log)
+
+    log = []
+    renderer = StreamRenderer(Element(log), fps=0, flush_bytes=1)
+    for chunk in ["Hello", " world\n\n", "Next"]:
+        renderer.write(chunk)
+    assert renderer.close() == "Hello world\n\nNext"
+    final = [(element, text) for element, text in log if not text.endswith(StreamRenderer.CURSOR)]
+    assert [text for _, text in final] == ["Hello world\n\n", "Next"]
+    assert final[0][0] != final[1][0]
@@ -0,0 +1,68 @@
+import json
+import base64
+import pytest
+from email.parser import BytesParser
+from email.policy import HTTP
+from helpers.transport import MultipartBody, iter_json_body
+
+PAYLOAD = {
+    "chat_session_id": "s1",
+    "messages": [
+        {"role": "user", "content": "héllo \"quoted\" \\ \n ✓ " * 20},
+        {"role": "user", "content": [
+            {"type": "text", "text": "look"},
+            {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": base64.b64encode(bytes(range(256)) * 40).decode()}},
+            {"document": {"format": "pdf", "name": "doc", "source": {"bytes": base64.b64encode(b"%PDF-1.7 " * 300).decode()}}},
+        ]},
+    ],
+    "temperature": 0.7,
+    "stream": True,
+    "stop": None,
+}
+
+@pytest.mark.parametrize("chunk_size", [-1, 0, 1, 7, 1024, 1 << 20])
+def test_json_body_round_trips(chunk_size):
+    chunks = list(iter_json_body(PAYLOAD, chunk_size))
+    assert all(chunks)
+    assert json.loads(b"".join(chunks)) == PAYLOAD
+
+def test_json_body_is_chunked_to_size():
+    chunks = list(iter_json_body(PAYLOAD, 1024))
+    assert len(chunks) > 1
+    # Pieces are merged until they reach chunk_size; a long string slice can add at most one more slice.
+    assert all(len(chunk) >= 1024 for chunk in chunks[:-1])
+    assert max(len(chunk) for chunk in chunks) < 1024 * 2 * 4
+
+def parse_multipart(body: MultipartBody) -> dict:
+    raw = f"Content-Type: {body.content_type}\r\n\r\n".encode() + b"".join(body)
+    message = BytesParser(policy=HTTP).parsebytes(raw)
+    assert message.is_multipart()
+    return {part.get_param("name", header="content-disposition"): (part.get_content_type(), part.get_payload(decode=True)) for part in message.iter_parts()}
+
+@pytest.mark.parametrize("chunk_size", [0, 3, 10, 4096])
+def test_multipart_framing(chunk_size):
+    body = MultipartBody(PAYLOAD, chunk_size)
+    assert body.chunk_size % 4 == 0 and body.chunk_size >= 4
+    parts = parse_multipart(body)
+
+    assert list(parts) == ["payload", "file-0", "file-1"]
+    content_type, payload = parts["payload"]
+    assert content_type == "application/json"
+    payload = json.loads(payload)
+    image, document = payload["messages"][1]["content"][1:]
+    assert image["source"] == {"type": "base64", "media_type": "image/png", "part": "file-0"}
+    assert document["document"]["source"] == {"part": "file-1"}
+    assert payload["messages"][0] == PAYLOAD["messages"][0]
+
+    assert parts["file-0"] == ("image/png", bytes(range(256)) * 40)
+    assert parts["file-1"] == ("application/octet-stream", b"%PDF-1.7 " * 300)
+
+def test_multipart_does_not_modify_the_payload():
+    before = json.dumps(PAYLOAD)
+    list(MultipartBody(PAYLOAD, 64))
+    assert json.dumps(PAYLOAD) == before
+
+def test_multipart_boundary_is_unique_and_terminates_the_body():
+    first, second = MultipartBody(PAYLOAD, 64), MultipartBody(PAYLOAD, 64)
+    assert first.boundary != second.boundary
+    assert b"".join(first).endswith(f"--{first.boundary}--\r\n".encode())
@@ -0,0 +1,30 @@
+import io
+import base64
+import random
+import hashlib
+from PIL import Image
+from helpers.utils import FileProcessStatus, Utils
+
+class Upload(io.BytesIO):
+    def __init__(self, data: bytes, name: str, type: str):
+        super().__init__(data)
+        self.name = name
+        self.type = type
+
+def test_reference_hash_covers_the_bytes_sent():
+    rng = random.Random(0)
+    image = Image.frombytes("RGB", (256, 256), bytes(rng.randrange(256) for _ in range(256 * 256 * 3)))
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    data = output.getvalue()
+
+    utils = Utils()
+    utils.image_preprocessor.enabled = True
+    attachment = utils.process_single_file(Upload(data, "noise.png", "image/png"))
+
+    sent = base64.b64decode(attachment.base64)
+    assert attachment.status == FileProcessStatus.COMPLETED
+    assert sent != data
+    assert attachment.sha256 == hashlib.sha256(data).hexdigest()
+    assert attachment.content_sha256 == hashlib.sha256(sent).hexdigest()
+    assert attachment.size == len(sent)